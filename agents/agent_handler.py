@@ -1,28 +1,99 @@
 import os
-from langchain import hub
-from langchain.agents import create_react_agent, AgentExecutor
+import re
 from langchain_groq import ChatGroq
+from utils.metrics import MetricsCallbackHandler, timed, increment
+from utils.llm_gateway import with_gateway
+from agents.prompts import REACT_CHAT_TEMPLATE, DOCUMENT_ANSWER_TEMPLATE
+from config.config import AGENT_MAX_ITERATIONS, AGENT_MAX_EXECUTION_SECONDS, AGENT_FAST_PATH
+
+DOCUMENT_TOOL_NAME = "local_document_search"
+# Questions mentioning these are about the salary guides and policies in the knowledge base...
+DOCUMENT_CUES = re.compile(
+    r"\b(salary|salaries|pay|paid|ctc|compensation|package|lpa|bonus|variable|hike|increment|band|stipend|benefits|policy|policies)\b",
+    re.IGNORECASE,
+)
+# ...unless they also ask for live or web information, which needs the full agent.
+WEB_CUES = re.compile(
+    r"\b(latest|today|news|current|currently|recent|now|stock|share price|web|online|google|link|url|openings|hiring|search)\b",
+    re.IGNORECASE,
+)
+# Response-style hints the app appends to the question; they are not part of the search query.
+STYLE_HINT = re.compile(r"\s*\(Please [^)]*\)\s*$")
 
 def get_agent_llm():
-    """Returns the Groq LLM, which is suitable for agentic tasks."""
+    """Returns the Groq LLM, which is suitable for agentic tasks. Streams tokens so callbacks can render them live."""
     groq_api_key = os.getenv("GROQ_API_KEY")
     if not groq_api_key:
         raise ValueError("GROQ_API_KEY not found in .env file.")
         
-    return ChatGroq(
+    llm = ChatGroq(
         groq_api_key=groq_api_key,
         model_name="llama3-70b-8192",
-        temperature=0
+        temperature=0,
+        streaming=True,
+        max_retries=0 # The gateway retries rate-limited calls.
     )
+    return with_gateway(llm, callbacks=[MetricsCallbackHandler("llm.groq")])
+
+def is_document_question(question):
+    """Routes short questions about pay or policies, with no request for live information, to the fast path."""
+    return len(question.split()) <= 40 and bool(DOCUMENT_CUES.search(question)) and not WEB_CUES.search(question)
+
+class RoutedAgentExecutor:
+    """
+    Answers simple document questions with one knowledge-base search and one LLM call, and sends
+    everything else (or anything the search finds nothing for) through the ReAct agent executor.
+    Exposes the same invoke() interface as AgentExecutor.
+    """
+
+    def __init__(self, llm, agent_executor, document_tool=None, fast_path=AGENT_FAST_PATH):
+        self.llm = llm
+        self.agent_executor = agent_executor
+        self.document_tool = document_tool
+        self.fast_path = fast_path and document_tool is not None
+
+    def _answer_from_documents(self, inputs, config):
+        question = inputs["input"]
+        context = self.document_tool.invoke(STYLE_HINT.sub("", question))
+        if not context or context.startswith(("No relevant", "Error")):
+            return None
+        prompt = DOCUMENT_ANSWER_TEMPLATE.format(
+            context=context, chat_history=inputs.get("chat_history") or "", input=question
+        )
+        return self.llm.invoke(prompt, config).content
+
+    def invoke(self, inputs, config=None):
+        if self.fast_path and is_document_question(inputs["input"]):
+            with timed("agent.fast_path"):
+                output = self._answer_from_documents(inputs, config)
+            if output is not None:
+                increment("calls", "agent.route.fast_path")
+                return {**inputs, "output": output}
+        increment("calls", "agent.route.react")
+        return self.agent_executor.invoke(inputs, config)
 
 def create_agent_executor(llm, tools):
-    """Creates the agent and the agent executor that runs it."""
-    prompt = hub.pull("hwchase17/react-chat")
+    """Creates the agent and the agent executor that runs it, behind the document fast path."""
+    # Imported here so that loading the LLM does not pull in the agent stack.
+    from langchain_core.prompts import PromptTemplate
+    from langchain.agents import create_react_agent, AgentExecutor
+
+    # LLM calls are already recorded by the model's own handler; this one records tools and steps.
+    # Executor callbacks are not inherited by tool runs, so the tools get the handler directly.
+    metrics_handler = MetricsCallbackHandler(llm_stage=None)
+    for agent_tool in tools:
+        agent_tool.callbacks = [metrics_handler]
+
+    prompt = PromptTemplate.from_template(REACT_CHAT_TEMPLATE)
     agent = create_react_agent(llm, tools, prompt)
     agent_executor = AgentExecutor(
         agent=agent, 
         tools=tools, 
         verbose=True,
-        handle_parsing_errors=True
+        handle_parsing_errors=True,
+        max_iterations=AGENT_MAX_ITERATIONS,
+        max_execution_time=AGENT_MAX_EXECUTION_SECONDS,
+        callbacks=[metrics_handler]
     )
-    return agent_executor
\ No newline at end of file
+    document_tool = next((t for t in tools if t.name == DOCUMENT_TOOL_NAME), None)
+    return RoutedAgentExecutor(llm, agent_executor, document_tool)
\ No newline at end of file
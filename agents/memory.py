@@ -0,0 +1,102 @@
+import threading
+import traceback
+from langchain_core.messages import get_buffer_string
+from utils.context import estimate_tokens, truncate_to_tokens
+from utils.metrics import timed, increment
+from config.config import AGENT_MEMORY_TURNS, AGENT_MEMORY_MAX_TOKENS, AGENT_SUMMARY_MAX_TOKENS
+
+SUMMARY_PROMPT = """
+Progressively summarize the conversation between a user and Kariar, a career and compensation assistant.
+Keep facts the assistant may need later: the user's role, experience, location, target companies, offers and numbers discussed, and any decisions made.
+Write at most {max_words} words of plain prose.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:
+"""
+
+class ConversationMemory:
+    """
+    Bounded chat history for the agent. The last `recent_turns` exchanges are kept verbatim and
+    older ones are folded into a running summary by a background LLM call, so a turn never waits
+    on summarization. The prompt-ready history never exceeds max_tokens: the summary gets at most
+    summary_tokens and the newest messages fill the rest. Messages that have left the window but
+    are not summarized yet (the run is pending or in flight) are still sent verbatim, budget permitting.
+    """
+
+    def __init__(self, llm, recent_turns=AGENT_MEMORY_TURNS, max_tokens=AGENT_MEMORY_MAX_TOKENS, summary_tokens=AGENT_SUMMARY_MAX_TOKENS):
+        self.llm = llm
+        self.recent_turns = recent_turns
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        self.summarized_count = 0
+        self._lock = threading.Lock()
+        self._summarizing = False
+
+    def _summarize(self, messages, end):
+        try:
+            with timed("agent.memory.summarize"):
+                prompt = SUMMARY_PROMPT.format(
+                    max_words=self.summary_tokens * 3 // 4,
+                    summary=self.summary or "(empty)",
+                    new_lines=get_buffer_string(messages),
+                )
+                summary = truncate_to_tokens(self.llm.invoke(prompt).content.strip(), self.summary_tokens)
+            with self._lock:
+                self.summary = summary
+                self.summarized_count = end
+        except Exception:
+            print("--- ERROR while summarizing chat history ---")
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._summarizing = False
+
+    def _schedule_summary(self, messages, window_start):
+        """Starts folding messages[summarized_count:window_start] into the summary unless a run is in flight."""
+        with self._lock:
+            if self._summarizing or window_start <= self.summarized_count:
+                return
+            self._summarizing = True
+            pending = messages[self.summarized_count:window_start]
+        threading.Thread(
+            target=self._summarize, args=(pending, window_start), name="agent-memory-summary", daemon=True
+        ).start()
+
+    def chat_history(self, messages):
+        """
+        Returns the history to pass as the agent's chat_history for the full list of messages so
+        far, and schedules summarization of any turns that have dropped out of the window.
+        """
+        window_start = max(0, len(messages) - 2 * self.recent_turns)
+        self._schedule_summary(messages, window_start)
+
+        with self._lock:
+            summary, summarized_count = self.summary, self.summarized_count
+        parts = []
+        budget = self.max_tokens
+        if summary:
+            summary_text = f"Summary of earlier conversation: {summary}"
+            parts.append(summary_text)
+            budget -= estimate_tokens(summary_text)
+
+        recent = []
+        for message in reversed(messages[min(summarized_count, window_start):]):
+            line = get_buffer_string([message])
+            tokens = estimate_tokens(line) + 1
+            if tokens > budget:
+                if not recent and budget > 0:
+                    recent.append(truncate_to_tokens(line, budget - 1))
+                break
+            recent.append(line)
+            budget -= tokens
+        parts.extend(reversed(recent))
+
+        history = "\n".join(parts)
+        increment("prompt_tokens", "agent.memory", estimate_tokens(history))
+        return history
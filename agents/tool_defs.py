@@ -1,8 +1,15 @@
 import os
-import requests
 import json
-from langchain.tools import tool
-from langchain.tools.retriever import create_retriever_tool
+from utils.http_client import request_json, normalize_query
+from utils.rag_handler import retrieve_context
+from utils.cache import ResultCache, make_cache_key
+from config.config import BRAVE_SEARCH_URL, TOOL_CACHE_SIZE, TOOL_CACHE_TTL_SECONDS
+from langchain.tools import tool, Tool
+
+# Tool outputs starting with these are failures and are never memoized.
+TOOL_ERROR_PREFIXES = ("Error", "An error occurred")
+
+_tool_cache = ResultCache("agent_tools", max_entries=TOOL_CACHE_SIZE, ttl_seconds=TOOL_CACHE_TTL_SECONDS)
 
 @tool
 def brave_web_search(query: str) -> str:
@@ -14,14 +21,14 @@ def brave_web_search(query: str) -> str:
     if not api_key:
         return "Error: BRAVE_API_KEY not found."
 
-    url = "https://api.search.brave.com/res/v1/web/search"
     headers = {"X-Subscription-Token": api_key, "Accept": "application/json"}
     params = {"q": query}
 
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        results = response.json()
+        results = request_json(
+            "GET", BRAVE_SEARCH_URL, headers=headers, params=params,
+            cache_key=("brave",) + normalize_query(query), stage="http.brave"
+        )
         
         if not results.get("web", {}).get("results"):
             return "No results found."
@@ -37,17 +44,36 @@ def brave_web_search(query: str) -> str:
     except Exception as e:
         return f"An error occurred during web search: {e}"
 
+def memoize_tool(agent_tool):
+    """
+    Returns a copy of a single-input tool that reuses the result of an identical call (same tool,
+    same normalized input) within a turn and across turns until TOOL_CACHE_TTL_SECONDS expires.
+    """
+    func = agent_tool.func
+
+    def memoized(query: str) -> str:
+        key = make_cache_key(agent_tool.name, normalize_query(query))
+        result = _tool_cache.get(key)
+        if result is None:
+            result = func(query)
+            if not result.startswith(TOOL_ERROR_PREFIXES):
+                _tool_cache.set(key, result)
+        return result
+
+    return Tool(name=agent_tool.name, description=agent_tool.description, func=memoized)
+
 def get_tools(vectorstore):
     """
     Creates and returns a list of tools for the agent to use.
     """
-    # The RAG tool for searching local documents remains the same
-    retriever = vectorstore.as_retriever()
-    document_retriever_tool = create_retriever_tool(
-        retriever,
-        "local_document_search",
-        "Searches and returns relevant information from your local knowledge base of documents. Use this for questions about salary guides, company policies, or resumes."
-    )
+    # The RAG tool goes through retrieve_context, whose caches are keyed by index version, so it is
+    # not memoized here: a tool-level cache would keep serving results from before a re-index.
+    @tool("local_document_search")
+    def document_retriever_tool(query: str) -> str:
+        """
+        Searches and returns relevant information from your local knowledge base of documents. Use this for questions about salary guides, company policies, or resumes.
+        """
+        return retrieve_context(query, vectorstore) or "No relevant information found in the local knowledge base."
     
     # We now return our custom brave_web_search tool
-    return [brave_web_search, document_retriever_tool]
\ No newline at end of file
+    return [memoize_tool(brave_web_search), document_retriever_tool]
\ No newline at end of file
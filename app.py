@@ -1,48 +1,65 @@
 import streamlit as st
 from dotenv import load_dotenv
-import pandas as pd
 import json
+import math
 import os
 
 # --- UTILITY IMPORTS ---
+# Only light modules are imported here. pandas, FAISS, sentence-transformers and the
+# agent stack are imported on first use or by the background warm-up below.
 from utils.parser import extract_text_from_pdf
-from utils.llm_handler import analyze_document_text
-from utils.rag_handler import setup_vector_store, get_targeted_salary_estimation
+from utils.llm_handler import (
+    analyze_document_text, analyze_documents_concurrently, analyze_offer_text, stream_resume_improvement_suggestions,
+    DOCUMENT_TEXT_MAX_CHARS
+)
 from utils.api_handler import get_jooble_job_openings
-from models.embeddings import get_embedding_model
+from utils.startup import BackgroundTask, timed_import, import_report
+from utils import metrics
+from config.config import METRICS_PORT, METRICS_HOST
 
 # --- AGENT IMPORTS ---
-from agents.agent_handler import get_agent_llm, create_agent_executor
-from agents.tool_defs import get_tools
-from langchain_community.chat_message_histories import StreamlitChatMessageHistory
+from agents.agent_handler import get_agent_llm
 
 load_dotenv()
 
 @st.cache_resource
-def load_ai_resources():
-    """Loads all AI models, tools, and the agent executor."""
+def load_llm():
+    """Loads the LLM, which every feature needs. This is cheap and done before the first render."""
+    metrics.start_metrics_server(METRICS_PORT, METRICS_HOST)
     try:
-        llm = get_agent_llm()
-        embedding_model = get_embedding_model()
-        vector_store = setup_vector_store(embedding_model)
-
-        agent_executor = None
-        if vector_store:
-            tools = get_tools(vector_store)
-            agent_executor = create_agent_executor(llm, tools)
-        
-        # --- FIX 1: Return the vector_store as well ---
-        return llm, vector_store, agent_executor
+        return get_agent_llm()
     except Exception as e:
         st.error(f"A critical error occurred during AI resource initialization: {e}")
-        return None, None, None
+        return None
+
+def _build_knowledge_resources(llm):
+    """Loads the embedding model, the vector store, and the agent executor. Runs on a background thread."""
+    embedding_model = timed_import("models.embeddings").get_embedding_model()
+    vector_store = timed_import("utils.rag_handler").load_vector_store(embedding_model)
+
+    agent_executor = None
+    if vector_store:
+        tools = timed_import("agents.tool_defs").get_tools(vector_store)
+        agent_executor = timed_import("agents.agent_handler").create_agent_executor(llm, tools)
+    return vector_store, agent_executor
+
+@st.cache_resource
+def start_knowledge_warmup(_llm):
+    """Starts loading the knowledge base and agent in the background, once per process."""
+    return BackgroundTask("knowledge_base", _build_knowledge_resources, _llm)
+
+def wait_for_knowledge(warmup):
+    """Blocks (with a spinner) until the background warm-up has finished; returns (vector_store, agent_executor)."""
+    if not warmup.ready():
+        with st.spinner("Loading the knowledge base..."):
+            warmup.result()
+    return warmup.result() or (None, None)
 
 def main():
     st.set_page_config(page_title="PayGrade AI", page_icon="")
     st.title("PayGrade AI")
 
-    # --- FIX 2: Receive the vector_store here ---
-    llm, vector_store, agent_executor = load_ai_resources()
+    llm = load_llm()
 
     st.sidebar.title("Configuration")
     st.sidebar.subheader("Response Style")
@@ -57,16 +74,36 @@ def main():
         st.error("Fatal Error: Could not initialize the Language Model. Please check your API keys.")
         st.stop()
 
-    feature_list = ["Resume Analysis & Job Matching", "Compare Multiple Offers"]
-    if agent_executor:
+    warmup = start_knowledge_warmup(llm)
+    feature_list = ["Resume Analysis & Job Matching", "Compare Multiple Offers", "AI Agent & Simulator"]
+    if not warmup.ready():
+        st.sidebar.info("AI Agent is warming up in the background...", icon="⏳")
+    elif (warmup.result() or (None, None))[1]:
         st.sidebar.success("AI Agent is ONLINE", icon="✅")
-        feature_list.append("AI Agent & Simulator")
     else:
         st.sidebar.warning("AI Agent is OFFLINE", icon="⚠️")
-        st.sidebar.info("The Agent is offline. Please ensure the `documents` folder exists and contains at least one PDF.")
+        if warmup.error:
+            st.sidebar.error(f"A critical error occurred during AI resource initialization: {warmup.error}")
+        else:
+            st.sidebar.info("The Agent is offline. Please ensure the `documents` folder exists and contains at least one PDF.")
         
     app_mode = st.sidebar.selectbox("Select a Feature", feature_list)
 
+    st.sidebar.write("---")
+    if st.sidebar.checkbox("Show performance metrics", key="show_metrics"):
+        with st.sidebar.expander("Stage metrics", expanded=True):
+            pd = timed_import("pandas")
+            rows = metrics.summary_rows()
+            if rows:
+                st.dataframe(pd.DataFrame(rows).set_index("stage"))
+            else:
+                st.caption("No metrics recorded yet.")
+            imports = import_report()
+            if imports:
+                st.caption("Import times")
+                st.dataframe(pd.DataFrame(imports, columns=["module", "seconds"]).set_index("module"))
+            st.download_button("Download JSON", metrics.to_json(), file_name="paygrade_metrics.json")
+
     if app_mode == "Resume Analysis & Job Matching":
         st.header("Analyze Resume, Estimate Salary & Find Jobs")
         
@@ -76,12 +113,14 @@ def main():
             if 'last_file' not in st.session_state or st.session_state.last_file != uploaded_file.name:
                 st.session_state.update({
                     'analysis': None, 'salary_estimation': None, 'job_openings': None,
+                    'resume_text': None, 'resume_suggestions': None,
                     'last_file': uploaded_file.name
                 })
 
-            text = extract_text_from_pdf(uploaded_file)
+            text = extract_text_from_pdf(uploaded_file, max_chars=DOCUMENT_TEXT_MAX_CHARS)
             
             if text and "Error" not in text:
+                st.session_state.resume_text = text
                 with st.spinner("Analyzing resume profile..."):
                     analysis_result = analyze_document_text(text, llm, response_mode=st.session_state.response_mode)
                 
@@ -103,23 +142,35 @@ def main():
 
             col1, col2 = st.columns(2)
             with col1:
-                # The error was here because 'vector_store' was not defined in this scope. It is now.
-                if st.button("Estimate Salary & Analyze Fit"):
-                    if target_role_input and vector_store:
-                        with st.spinner("Comparing your profile..."):
-                            st.session_state.salary_estimation = get_targeted_salary_estimation(
-                                st.session_state.analysis, target_role_input, target_location_input,
-                                vector_store, llm, response_mode=st.session_state.response_mode
-                            )
+                estimate_clicked = st.button("Estimate Salary & Analyze Fit")
             with col2:
                 if st.button("Find Jobs for This Target Role"):
                     if target_role_input:
                         with st.spinner(f"Searching for '{target_role_input}' jobs..."):
                             st.session_state.job_openings = get_jooble_job_openings(target_role_input, target_location_input)
 
-            if st.session_state.get('salary_estimation'):
+            vector_store = wait_for_knowledge(warmup)[0] if estimate_clicked and target_role_input else None
+            if estimate_clicked and target_role_input and vector_store:
+                rag_handler = timed_import("utils.rag_handler")
+                st.subheader("✅ Salary & Profile Fit Analysis:")
+                with st.container(border=True):
+                    st.session_state.salary_estimation = st.write_stream(rag_handler.stream_targeted_salary_estimation(
+                        st.session_state.analysis, target_role_input, target_location_input,
+                        vector_store, llm, response_mode=st.session_state.response_mode
+                    ))
+            elif st.session_state.get('salary_estimation'):
                 st.subheader("✅ Salary & Profile Fit Analysis:")
                 st.info(st.session_state.salary_estimation)
+
+            if st.button("Suggest Resume Improvements") and st.session_state.get('resume_text'):
+                st.subheader("📝 Resume Improvement Suggestions:")
+                with st.container(border=True):
+                    st.session_state.resume_suggestions = st.write_stream(stream_resume_improvement_suggestions(
+                        st.session_state.resume_text, llm, response_mode=st.session_state.response_mode
+                    ))
+            elif st.session_state.get('resume_suggestions'):
+                st.subheader("📝 Resume Improvement Suggestions:")
+                st.info(st.session_state.resume_suggestions)
             
             if st.session_state.get('job_openings'):
                 st.subheader("🔍 Live Job Openings:")
@@ -140,27 +191,74 @@ def main():
         uploaded_files = st.file_uploader("Upload 2 or more offer letters (PDFs)", type="pdf", accept_multiple_files=True)
         
         if uploaded_files and len(uploaded_files) > 1:
-            all_analyses = []
-            with st.spinner(f"Analyzing {len(uploaded_files)} offers..."):
-                for file in uploaded_files:
-                    text = extract_text_from_pdf(file)
-                    if text and "Error" not in text:
-                        analysis_str = analyze_document_text(text, llm)
-                        try:
-                            analysis_json = json.loads(analysis_str.strip())
-                            analysis_json['File Name'] = file.name
-                            all_analyses.append(analysis_json)
-                        except (json.JSONDecodeError, TypeError):
-                            st.warning(f"Could not parse analysis for {file.name}.")
-            
-            if all_analyses:
-                st.subheader("Offer Comparison Table")
-                df = pd.DataFrame(all_analyses).set_index('File Name')
-                st.dataframe(df)
+            offers = timed_import("utils.offers")
+            offer_texts = []
+            for file in uploaded_files:
+                text = extract_text_from_pdf(file, max_chars=DOCUMENT_TEXT_MAX_CHARS)
+                if text and "Error" not in text:
+                    offer_texts.append((file.name, text))
+                else:
+                    st.warning(f"Could not read {file.name}.")
+
+            with st.expander("Ranking weights"):
+                weights = {
+                    column: st.slider(label, 0.0, 1.0, default, 0.05)
+                    for column, label, default in [
+                        ("ctc_annual", "Total CTC", offers.DEFAULT_OFFER_WEIGHTS["ctc_annual"]),
+                        ("base_annual", "Base salary", offers.DEFAULT_OFFER_WEIGHTS["base_annual"]),
+                        ("bonus_annual", "Bonus", offers.DEFAULT_OFFER_WEIGHTS["bonus_annual"]),
+                        ("equity_annual", "Equity", offers.DEFAULT_OFFER_WEIGHTS["equity_annual"]),
+                        ("market_percentile", "Market percentile", 0.0),
+                    ]
+                }
+
+            offer_rows = []
+            st.subheader("Offer Comparison Table")
+            st.caption(f"Amounts are annual, in {offers.OFFER_BASE_CURRENCY}.")
+            progress = st.progress(0.0, text=f"Analyzing {len(offer_texts)} offers...")
+            table_placeholder = st.empty()
+            analyses = analyze_documents_concurrently(
+                offer_texts, llm, response_mode=st.session_state.response_mode, analyze_fn=analyze_offer_text
+            )
+            for done, (file_name, analysis_str) in enumerate(analyses, start=1):
+                try:
+                    offer_row = offers.normalize_offer(json.loads(analysis_str.strip()), file_name)
+                    offer_rows.append(offer_row)
+                    if math.isnan(offer_row["fx_rate"]):
+                        st.warning(
+                            f"{file_name}: no exchange rate for currency '{offer_row['currency']}', so its amounts are left blank. "
+                            "Add it to PAYGRADE_CURRENCY_RATES_TO_INR to compare it."
+                        )
+                    table_placeholder.dataframe(offers.offers_frame(offer_rows).set_index('file_name'))
+                except (json.JSONDecodeError, TypeError, AttributeError):
+                    st.warning(f"Could not parse analysis for {file_name}.")
+                progress.progress(done / len(offer_texts), text=f"Analyzed {done} of {len(offer_texts)} offers")
+            progress.empty()
+
+            if offer_rows:
+                ranked = offers.rank_offers(offers.add_market_percentiles(offers.offers_frame(offer_rows)), weights)
+                table_placeholder.dataframe(ranked.set_index('file_name'))
+                elsewhere = ranked[ranked["market_location_found"].eq(False).fillna(False)]
+                for file_name, location, market_location in elsewhere[["file_name", "location", "market_location"]].itertuples(index=False):
+                    st.warning(f"{file_name}: location not found in the salary table ({location}); market figures are for {market_location.title() or 'India'}.")
+                st.download_button("Download CSV", offers.export_offers(ranked, "csv"), file_name="offers.csv", mime="text/csv")
+                try:
+                    st.download_button("Download Parquet", offers.export_offers(ranked, "parquet"), file_name="offers.parquet")
+                except ImportError:
+                    pass # Parquet export is optional and needs pyarrow.
 
     elif app_mode == "AI Agent & Simulator":
         st.header("🤖 Chat With Kariar")
+        agent_executor = wait_for_knowledge(warmup)[1]
+        if not agent_executor:
+            st.warning("The Agent is offline. Please ensure the `documents` folder exists and contains at least one PDF.")
+            st.stop()
+
+        StreamlitChatMessageHistory = timed_import("langchain_community.chat_message_histories").StreamlitChatMessageHistory
+        StreamlitCallbackHandler = timed_import("langchain_community.callbacks.streamlit").StreamlitCallbackHandler
         history = StreamlitChatMessageHistory(key="agent_chat_history")
+        if st.session_state.agent_memory is None:
+            st.session_state.agent_memory = timed_import("agents.memory").ConversationMemory(llm)
         
         if not history.messages:
             st.info("Ask me anything! I can search your documents or the live web for answers.")
@@ -170,22 +268,27 @@ def main():
 
         if prompt := st.chat_input("Ask a question..."):
             st.chat_message("human").write(prompt)
-            with st.spinner("Thinking..."):
-                if st.session_state.response_mode == "Concise":
-                    prompt_for_agent = f"{prompt} (Please keep your answer concise)"
-                else:
-                    prompt_for_agent = f"{prompt} (Please provide a detailed answer)"
-                
-                response = agent_executor.invoke({
-                    "input": prompt_for_agent,
-                    "chat_history": history.messages
-                })
-            st.chat_message("ai").write(response["output"])
+            if st.session_state.response_mode == "Concise":
+                prompt_for_agent = f"{prompt} (Please keep your answer concise)"
+            else:
+                prompt_for_agent = f"{prompt} (Please provide a detailed answer)"
+
+            with st.chat_message("ai"):
+                # Streams the agent's reasoning steps and LLM tokens into the chat bubble as they arrive.
+                stream_handler = StreamlitCallbackHandler(st.container(), expand_new_thoughts=False)
+                response = agent_executor.invoke(
+                    {"input": prompt_for_agent, "chat_history": st.session_state.agent_memory.chat_history(history.messages)},
+                    {"callbacks": [stream_handler]}
+                )
+                st.write(response["output"])
             history.add_user_message(prompt)
             history.add_ai_message(response["output"])
 
 if __name__ == "__main__":
-    keys_to_init = ['analysis', 'salary_estimation', 'job_openings', 'last_file', 'agent_chat_history']
+    keys_to_init = [
+        'analysis', 'salary_estimation', 'job_openings', 'last_file', 'agent_chat_history',
+        'resume_text', 'resume_suggestions', 'agent_memory'
+    ]
     for key in keys_to_init:
         if key not in st.session_state:
             st.session_state[key] = [] if 'history' in key else None
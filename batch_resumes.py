@@ -0,0 +1,169 @@
+import os
+import json
+import sqlite3
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
+from dotenv import load_dotenv
+
+from utils.parser import extract_text_from_pdf
+from utils.llm_handler import get_llm, analyze_document_text, DOCUMENT_TEXT_MAX_CHARS
+from utils.llm_gateway import configure_gateway
+from utils.rag_handler import load_vector_store, get_targeted_salary_estimation
+from config.config import ANALYSIS_MAX_CONCURRENCY, LLM_RATE_SHARE
+
+def iter_resume_paths(input_dir=None, manifest=None):
+    """
+    Lazily yields resume paths in a deterministic order, either by walking input_dir
+    (sorted per directory) or by reading a manifest with one path per line.
+    """
+    if manifest:
+        with open(manifest, "r", encoding="utf-8") as f:
+            for line in f:
+                path = line.strip()
+                if path and not path.startswith("#"):
+                    yield path
+        return
+
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                yield os.path.join(root, name)
+
+class Checkpoint:
+    """
+    On-disk set of finished resumes, keyed by resolved path, so adding, removing or reordering
+    inputs between runs never skips the wrong file. It is a SQLite table looked up per path, so
+    memory stays flat however many resumes a run covers; each mark is committed on its own.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS done (path TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._db.commit()
+
+    @staticmethod
+    def key(path):
+        return os.path.realpath(path)
+
+    def is_done(self, path):
+        return self._db.execute("SELECT 1 FROM done WHERE path = ?", (self.key(path),)).fetchone() is not None
+
+    def mark_done(self, path):
+        with self._db:
+            self._db.execute("INSERT OR IGNORE INTO done (path) VALUES (?)", (self.key(path),))
+
+    def close(self):
+        self._db.close()
+
+def _open_for_append(path):
+    """
+    Opens a JSONL file for appending. If a crash left a partial last line, a newline is written
+    first so the next record starts on its own line instead of being glued to the fragment.
+    """
+    output = open(path, "a+b")
+    if output.seek(0, os.SEEK_END) > 0:
+        output.seek(-1, os.SEEK_END)
+        if output.read(1) != b"\n":
+            output.write(b"\n")
+    output.close()
+    return open(path, "a", encoding="utf-8")
+
+def process_resume(path, llm, vectorstore=None, target_role=None, target_location=None, response_mode="Concise"):
+    """Runs the same parsing, analysis and salary estimation as the app for one resume and returns a JSON record."""
+    start = time.perf_counter()
+    record = {"path": path, "status": "ok"}
+    try:
+        text = extract_text_from_pdf(path, max_chars=DOCUMENT_TEXT_MAX_CHARS)
+        if not text or text.startswith("Error"):
+            raise ValueError(text or "No text could be extracted from the PDF.")
+
+        analysis_result = analyze_document_text(text, llm, response_mode=response_mode)
+        if not analysis_result:
+            raise ValueError("Resume analysis failed.")
+        record["analysis"] = json.loads(analysis_result.strip())
+
+        if target_role:
+            record["salary_estimation"] = get_targeted_salary_estimation(
+                record["analysis"], target_role, target_location, vectorstore, llm, response_mode=response_mode
+            )
+    except Exception as e:
+        record.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    record["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+def run_batch(paths, output_path, llm, concurrency=ANALYSIS_MAX_CONCURRENCY, **process_kwargs):
+    """
+    Processes resumes with at most `concurrency` in flight and appends one JSONL record per resume.
+    Successful resumes are checkpointed next to the output file so a re-run skips them; failed ones
+    are not, so a re-run retries them and appends a new record. A resume that finished right before
+    a crash may be written twice.
+    """
+    checkpoint = Checkpoint(output_path + ".checkpoint")
+    processed = errors = 0
+    with _open_for_append(output_path) as output, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight = {}
+
+        def drain(return_when):
+            nonlocal processed, errors
+            finished, _ = wait(in_flight, return_when=return_when)
+            for future in finished:
+                path = in_flight.pop(future)
+                record = future.result()
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                if record["status"] == "ok":
+                    checkpoint.mark_done(path)
+                processed += 1
+                errors += record["status"] == "error"
+
+        try:
+            for path in paths:
+                if checkpoint.is_done(path):
+                    continue
+                in_flight[pool.submit(process_resume, path, llm, **process_kwargs)] = path
+                if len(in_flight) >= concurrency:
+                    drain(FIRST_COMPLETED)
+            if in_flight:
+                drain(ALL_COMPLETED)
+        finally:
+            checkpoint.close()
+    return processed, errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Score resumes in bulk and write one JSON record per resume.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input-dir", help="Directory to walk for resume PDFs.")
+    source.add_argument("--manifest", help="Text file with one resume path per line.")
+    parser.add_argument("--output", required=True, help="JSONL output path; re-running with the same path resumes.")
+    parser.add_argument("--concurrency", type=int, default=ANALYSIS_MAX_CONCURRENCY)
+    parser.add_argument("--response-mode", choices=["Detailed", "Concise"], default="Concise")
+    parser.add_argument("--target-role", help="Also estimate salary fit for this role.")
+    parser.add_argument("--target-location", default="Bengaluru, India")
+    parser.add_argument(
+        "--rate-share", type=float, default=LLM_RATE_SHARE,
+        help="Share of the Groq quota this run may use; leave the rest for the app when they share an API key.",
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    configure_gateway(rate_share=args.rate_share)
+    llm = get_llm(priority="batch")
+    vectorstore = None
+    if args.target_role:
+        from models.embeddings import get_embedding_model
+        vectorstore = load_vector_store(get_embedding_model())
+
+    processed, errors = run_batch(
+        iter_resume_paths(args.input_dir, args.manifest), args.output, llm, concurrency=args.concurrency,
+        vectorstore=vectorstore, target_role=args.target_role, target_location=args.target_location,
+        response_mode=args.response_mode,
+    )
+    print(f"Processed {processed} resumes ({errors} errors); results in {args.output}")
+
+if __name__ == "__main__":
+    main()
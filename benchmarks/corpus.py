@@ -0,0 +1,94 @@
+import os
+import random
+import argparse
+
+ROLES = [
+    "Software Engineer", "Data Scientist", "Data Analyst", "DevOps Engineer", "Product Manager",
+    "QA Engineer", "Machine Learning Engineer", "Frontend Developer", "Backend Developer", "Cloud Architect",
+]
+CITIES = ["Bengaluru", "Mumbai", "Pune", "Hyderabad", "Chennai", "Gurugram", "Noida", "Delhi"]
+FILLER = (
+    "Compensation in the technology sector continues to be shaped by demand for niche skills, "
+    "hybrid work policies and the expansion of global capability centres across India. "
+    "Employers increasingly benchmark variable pay and retention bonuses against market medians."
+)
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _page_lines(rng, page_number, lines_per_page):
+    lines = [f"Synthetic Salary Guide - Page {page_number}"]
+    while len(lines) < lines_per_page:
+        if rng.random() < 0.6:
+            low = rng.randint(3, 25)
+            mid = low + rng.randint(2, 10)
+            high = mid + rng.randint(2, 15)
+            lines.append(f"{rng.choice(ROLES)} {rng.choice(CITIES)} {low} - {mid} - {high} LPA")
+        else:
+            lines.append(FILLER[: rng.randint(60, len(FILLER))])
+    return lines
+
+def write_pdf(path, pages):
+    """Writes a minimal, valid PDF whose pages contain the given lists of text lines."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        text = "\n".join(f"({_escape(line)}) Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td\n{text}\nET"
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode("latin-1")
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(output)
+
+def generate_corpus(output_dir, num_pdfs=10, pages_per_pdf=20, lines_per_page=50, seed=0):
+    """Generates a deterministic corpus of salary-guide-like PDFs. Returns the written paths."""
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for index in range(num_pdfs):
+        pages = [_page_lines(rng, page + 1, lines_per_page) for page in range(pages_per_pdf)]
+        path = os.path.join(output_dir, f"synthetic_salary_guide_{index:04d}.pdf")
+        write_pdf(path, pages)
+        paths.append(path)
+    return paths
+
+def generate_resume_text(seed):
+    """Returns a deterministic, distinct plain-text resume."""
+    rng = random.Random(seed)
+    role = rng.choice(ROLES)
+    start_year = rng.randint(2012, 2021)
+    return (
+        f"Candidate {seed}\ncandidate{seed}@example.com | +91 98{seed:08d}\n"
+        f"https://github.com/candidate{seed} | https://linkedin.com/in/candidate{seed}\n"
+        f"{role} at Example Corp {rng.choice(CITIES)} Jan {start_year} - Present\n"
+        + FILLER * rng.randint(2, 6)
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic PDF corpus for benchmarks.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--pdfs", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    written = generate_corpus(args.output_dir, args.pdfs, args.pages, args.lines, args.seed)
+    print(f"Wrote {len(written)} PDFs to {args.output_dir}")
@@ -0,0 +1,177 @@
+import json
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+FAKE_RESUME_ANALYSIS = {
+    "personal_details": {"name": "Synthetic Candidate", "email": "", "phone": "", "location": "Bengaluru", "links": []},
+    "summary": "Engineer with experience building data platforms.",
+    "total_experience_years": "4 years",
+    "work_experience": [],
+    "education": [],
+    "projects": [],
+    "technical_skills": {"languages": ["Python"], "libraries_and_technologies": ["Pandas", "FAISS"]},
+    "certifications": [],
+}
+
+def _estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+class FakeChatGroq(BaseChatModel):
+    """
+    Deterministic stand-in for ChatGroq. Sleeps for a fixed latency per call (plus a per-token
+    delay when streaming) and answers with canned JSON, ReAct steps or prose depending on the prompt.
+    """
+
+    model_name: str = "fake-groq"
+    latency_seconds: float = 0.0
+    seconds_per_token: float = 0.0
+
+    @property
+    def _llm_type(self):
+        return "fake-groq"
+
+    def _respond(self, prompt):
+        if "JSON" in prompt:
+            return json.dumps(FAKE_RESUME_ANALYSIS)
+        if "Action Input" in prompt:
+            scratchpad = prompt.rsplit("New input:", 1)[-1]
+            if "Observation" in scratchpad or "Action Input:" in scratchpad:
+                return "Thought: Do I need to use a tool? No\nFinal Answer: Median pay is 14 LPA."
+            return (
+                "Thought: Do I need to use a tool? Yes\nAction: local_document_search\n"
+                "Action Input: data scientist salary Bengaluru"
+            )
+        return "Based on the salary reports, the expected range is 12-18 LPA. " * 4
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = "\n".join(str(message.content) for message in messages)
+        text = self._respond(prompt)
+        time.sleep(self.latency_seconds + self.seconds_per_token * _estimate_tokens(text))
+        usage = {"input_tokens": _estimate_tokens(prompt), "output_tokens": _estimate_tokens(text)}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        message = AIMessage(content=text, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output={"token_usage": {
+            "prompt_tokens": usage["input_tokens"], "completion_tokens": usage["output_tokens"],
+        }})
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = "\n".join(str(message.content) for message in messages)
+        time.sleep(self.latency_seconds)
+        for word in self._respond(prompt).split(" "):
+            time.sleep(self.seconds_per_token * _estimate_tokens(word))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic embedding model: hashes token unigrams into a unit vector, so texts that
+    share words are close. Sleeps per batch and per text to model encoder cost.
+    """
+
+    def __init__(self, dimension=384, seconds_per_batch=0.0, seconds_per_text=0.0, model_name="fake-embeddings"):
+        self.dimension = dimension
+        self.seconds_per_batch = seconds_per_batch
+        self.seconds_per_text = seconds_per_text
+        self.model_name = model_name
+
+    def _embed(self, text):
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in text.lower().split():
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dimension] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        time.sleep(self.seconds_per_batch + self.seconds_per_text * len(texts))
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        time.sleep(self.seconds_per_batch + self.seconds_per_text)
+        return self._embed(text)
+
+def _fake_jobs(keywords, location):
+    return [
+        {"title": f"{keywords} {i}", "company": f"Company {i}", "location": location,
+         "snippet": "Synthetic job posting.", "link": f"https://example.com/jobs/{i}"}
+        for i in range(10)
+    ]
+
+class _FakeApiHandler(BaseHTTPRequestHandler):
+    latency_seconds = 0.0
+
+    def _send_json(self, payload):
+        time.sleep(self.latency_seconds)
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.startswith("/jooble/"):
+            self._send_json({"jobs": _fake_jobs(body.get("keywords", ""), body.get("location", ""))})
+        else:
+            self.send_error(404)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        if parsed.path == "/jsearch":
+            self._send_json({"data": [
+                {"employer_name": f"Employer {i}", "job_min_salary": 1_000_000 + i * 100_000,
+                 "job_max_salary": 1_800_000 + i * 100_000, "job_salary_period": "YEAR"}
+                for i in range(5)
+            ]})
+        elif parsed.path == "/brave":
+            q = query.get("q", [""])[0]
+            self._send_json({"web": {"results": [
+                {"title": f"{q} result {i}", "description": "Synthetic snippet.", "url": f"https://example.com/{i}"}
+                for i in range(5)
+            ]}})
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeApiServer:
+    """
+    Local HTTP server impersonating Jooble (POST /jooble/<key>), JSearch (GET /jsearch)
+    and Brave (GET /brave), with a fixed latency per request.
+    """
+
+    def __init__(self, latency_seconds=0.0, host="127.0.0.1"):
+        handler = type("FakeApiHandler", (_FakeApiHandler,), {"latency_seconds": latency_seconds})
+        self.server = ThreadingHTTPServer((host, 0), handler)
+        self.base_url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def urls(self):
+        """Environment overrides that point the app's API clients at this server."""
+        return {
+            "PAYGRADE_JOOBLE_API_URL": f"{self.base_url}/jooble",
+            "PAYGRADE_JSEARCH_API_URL": f"{self.base_url}/jsearch",
+            "PAYGRADE_BRAVE_SEARCH_URL": f"{self.base_url}/brave",
+        }
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.corpus import generate_corpus, generate_resume_text, write_pdf
+from benchmarks.fakes import FakeChatGroq, FakeEmbeddings, FakeApiServer
+
+QUERIES = [
+    "What is the salary range for a 'Data Scientist' in Bengaluru, India?",
+    "What is the salary range for a 'Software Engineer' in Pune, India?",
+    "How should I negotiate a counter offer?",
+    "Typical variable pay for a DevOps Engineer in Hyderabad",
+    "Cloud Architect compensation Mumbai",
+]
+
+def _latency_summary(samples):
+    samples = np.asarray(samples)
+    return {
+        "count": int(samples.size),
+        "mean_ms": float(samples.mean() * 1000),
+        "p50_ms": float(np.percentile(samples, 50) * 1000),
+        "p99_ms": float(np.percentile(samples, 99) * 1000),
+    }
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench_ingestion(rag_handler, embeddings, docs_dir, index_dir):
+    """Cold build, warm restart with no changes, and an incremental update after one PDF changes."""
+    results = {}
+    start = time.perf_counter()
+    vectorstore = rag_handler.setup_vector_store(embeddings, docs_path=docs_dir, index_dir=index_dir)
+    results["cold_seconds"] = time.perf_counter() - start
+    chunks = vectorstore.index.ntotal
+    results["chunks"] = chunks
+    results["cold_chunks_per_second"] = chunks / results["cold_seconds"]
+
+    start = time.perf_counter()
+    rag_handler.setup_vector_store(embeddings, docs_path=docs_dir, index_dir=index_dir)
+    results["warm_seconds"] = time.perf_counter() - start
+
+    changed = sorted(os.listdir(docs_dir))[0]
+    write_pdf(os.path.join(docs_dir, changed), [["Changed page", "Data Scientist Bengaluru 9 - 15 - 24 LPA"]])
+    start = time.perf_counter()
+    vectorstore = rag_handler.setup_vector_store(embeddings, docs_path=docs_dir, index_dir=index_dir)
+    results["incremental_one_file_seconds"] = time.perf_counter() - start
+    return results, vectorstore
+
+def bench_retrieval(rag_handler, vectorstore, iterations):
+    """Each query is timed with the query embedding and retrieval caches cleared, then again as a cache hit."""
+    cold, warm = [], []
+    for i in range(iterations):
+        query = QUERIES[i % len(QUERIES)]
+        rag_handler._query_embedding_cache.clear()
+        rag_handler._retrieval_cache.clear()
+        start = time.perf_counter()
+        rag_handler.retrieve_context(query, vectorstore)
+        cold.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        rag_handler.retrieve_context(query, vectorstore)
+        warm.append(time.perf_counter() - start)
+    return {"uncached": _latency_summary(cold), "cached": _latency_summary(warm)}
+
+def bench_analysis(llm_handler, llm, documents, max_concurrency):
+    texts = [(i, generate_resume_text(i)) for i in range(documents)]
+    start = time.perf_counter()
+    completed = sum(1 for _ in llm_handler.analyze_documents_concurrently(texts, llm, max_concurrency=max_concurrency))
+    elapsed = time.perf_counter() - start
+    return {
+        "documents": completed, "max_concurrency": max_concurrency,
+        "seconds": elapsed, "documents_per_second": completed / elapsed,
+    }
+
+def bench_agent(vectorstore, llm, iterations):
+    from agents.agent_handler import create_agent_executor
+    from agents.tool_defs import get_tools
+
+    try:
+        agent_executor = create_agent_executor(llm, get_tools(vectorstore))
+    except Exception as e:
+        return {"skipped": f"Could not build agent executor: {e}"}
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        agent_executor.invoke({"input": QUERIES[i % len(QUERIES)], "chat_history": []})
+        samples.append(time.perf_counter() - start)
+    return _latency_summary(samples)
+
+def bench_http(api_handler, iterations):
+    cold, warm = [], []
+    for i in range(iterations):
+        start = time.perf_counter()
+        api_handler.get_jooble_job_openings(f"Role {i}", "Bengaluru")
+        cold.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        api_handler.get_jooble_job_openings(f"role {i} ", "bengaluru")
+        warm.append(time.perf_counter() - start)
+    return {"uncached": _latency_summary(cold), "cached": _latency_summary(warm)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline PayGrade benchmarks using local LLM, embedding and HTTP stand-ins.")
+    parser.add_argument("--pdfs", type=int, default=8, help="Synthetic PDFs in the corpus.")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per synthetic PDF.")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fake Groq latency per call, in seconds.")
+    parser.add_argument("--embed-latency", type=float, default=0.0005, help="Fake embedding cost per text, in seconds.")
+    parser.add_argument("--http-latency", type=float, default=0.05, help="Fake API latency per request, in seconds.")
+    parser.add_argument("--queries", type=int, default=200, help="retrieve_context iterations.")
+    parser.add_argument("--documents", type=int, default=16, help="Resumes analyzed in the batch benchmark.")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--agent-turns", type=int, default=5)
+    parser.add_argument("--output", help="Write JSON results to this path instead of stdout.")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="paygrade-bench-")
+    try:
+        with FakeApiServer(latency_seconds=args.http_latency) as api:
+            # Configuration is read at import time, so the environment must be set before importing the app modules.
+            os.environ.update(api.urls())
+            os.environ.update({"JOOBLE_API_KEY": "bench", "JSEARCH_API_KEY": "bench", "BRAVE_API_KEY": "bench"})
+            os.environ["PAYGRADE_RESULT_CACHE_DIR"] = ""
+
+            from utils import rag_handler, llm_handler, api_handler, metrics
+
+            docs_dir = os.path.join(work_dir, "documents")
+            generate_corpus(docs_dir, num_pdfs=args.pdfs, pages_per_pdf=args.pages)
+            embeddings = FakeEmbeddings(seconds_per_text=args.embed_latency)
+            llm = FakeChatGroq(latency_seconds=args.llm_latency)
+
+            results = {
+                "meta": {
+                    "timestamp": time.time(), "git_revision": _git_revision(),
+                    "python": platform.python_version(), "platform": platform.platform(), "args": vars(args),
+                },
+            }
+            results["ingestion"], vectorstore = bench_ingestion(
+                rag_handler, embeddings, docs_dir, os.path.join(work_dir, "index")
+            )
+            results["retrieve_context"] = bench_retrieval(rag_handler, vectorstore, args.queries)
+            results["analyze_document_text_batch"] = bench_analysis(llm_handler, llm, args.documents, args.concurrency)
+            results["agent_round_trip"] = bench_agent(vectorstore, llm, args.agent_turns)
+            results["http_jooble"] = bench_http(api_handler, 10)
+            results["metrics"] = metrics.snapshot()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import os
+
+# --- KNOWLEDGE BASE / VECTOR STORE ---
+DOCUMENTS_DIR = os.getenv("PAYGRADE_DOCUMENTS_DIR", "documents")
+VECTOR_STORE_DIR = os.getenv("PAYGRADE_VECTOR_STORE_DIR", "vector_store")
+CHUNK_SIZE = int(os.getenv("PAYGRADE_CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("PAYGRADE_CHUNK_OVERLAP", "200"))
+
+# --- INGESTION ---
+# Worker processes used to parse PDFs; 1 keeps ingestion serial and in-process.
+INGEST_WORKERS = int(os.getenv("PAYGRADE_INGEST_WORKERS", str(os.cpu_count() or 1)))
+EMBED_BATCH_SIZE = int(os.getenv("PAYGRADE_EMBED_BATCH_SIZE", "64"))
+
+# --- RESULT CACHE ---
+RESULT_CACHE_SIZE = int(os.getenv("PAYGRADE_RESULT_CACHE_SIZE", "256"))
+# Directory for the on-disk cache tier; leave empty to keep the cache in memory only.
+RESULT_CACHE_DIR = os.getenv("PAYGRADE_RESULT_CACHE_DIR", "")
+
+# --- LLM CONCURRENCY ---
+# Upper bound on analysis calls in flight when several documents are analyzed at once.
+ANALYSIS_MAX_CONCURRENCY = int(os.getenv("PAYGRADE_ANALYSIS_MAX_CONCURRENCY", "4"))
+
+# --- EXTERNAL HTTP APIS ---
+JOOBLE_API_URL = os.getenv("PAYGRADE_JOOBLE_API_URL", "https://jooble.org/api")
+JSEARCH_API_URL = os.getenv("PAYGRADE_JSEARCH_API_URL", "https://jsearch.p.rapidapi.com/search")
+BRAVE_SEARCH_URL = os.getenv("PAYGRADE_BRAVE_SEARCH_URL", "https://api.search.brave.com/res/v1/web/search")
+HTTP_CONNECT_TIMEOUT = float(os.getenv("PAYGRADE_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("PAYGRADE_HTTP_READ_TIMEOUT", "20"))
+HTTP_MAX_RETRIES = int(os.getenv("PAYGRADE_HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("PAYGRADE_HTTP_BACKOFF_FACTOR", "0.5"))
+HTTP_POOL_SIZE = int(os.getenv("PAYGRADE_HTTP_POOL_SIZE", "10"))
+HTTP_CACHE_TTL_SECONDS = int(os.getenv("PAYGRADE_HTTP_CACHE_TTL_SECONDS", "900"))
+HTTP_CACHE_SIZE = int(os.getenv("PAYGRADE_HTTP_CACHE_SIZE", "512"))
+
+# --- STRUCTURED SALARY TABLE ---
+SALARY_TABLE_PATH = os.getenv("PAYGRADE_SALARY_TABLE_PATH", "data/salary_table.json")
+SALARY_TABLE_SOURCES = [
+    name.strip() for name in os.getenv(
+        "PAYGRADE_SALARY_TABLE_SOURCES",
+        "MP_IN_Salary_Guide_2024_Candidate_Report.pdf,"
+        "IT Pay structure (Gemini).pdf,"
+        "Current Wage Pay Structure for IT Sector Job Roles in India(Perplexity).pdf"
+    ).split(",") if name.strip()
+]
+
+# --- METRICS ---
+# Port for the /metrics (Prometheus) and /metrics.json endpoint; 0 disables it.
+METRICS_PORT = int(os.getenv("PAYGRADE_METRICS_PORT", "0"))
+# Interface the metrics endpoint binds to; set 0.0.0.0 to let a scraper on another host reach it.
+METRICS_HOST = os.getenv("PAYGRADE_METRICS_HOST", "127.0.0.1")
+
+# --- EMBEDDINGS ---
+EMBEDDING_MODEL_NAME = os.getenv("PAYGRADE_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+# "torch" (default PyTorch path), "onnx" (ONNX Runtime, needs sentence-transformers[onnx])
+# or "int8" (PyTorch with dynamic int8 quantization).
+EMBEDDING_BACKEND = os.getenv("PAYGRADE_EMBEDDING_BACKEND", "torch")
+EMBEDDING_BATCH_SIZE = int(os.getenv("PAYGRADE_EMBEDDING_BATCH_SIZE", "32"))
+# Intra-op threads for the encoder; 0 leaves the library default.
+EMBEDDING_THREADS = int(os.getenv("PAYGRADE_EMBEDDING_THREADS", "0"))
+# Encode document batches on a pool of worker processes kept for the life of the process.
+EMBEDDING_MULTI_PROCESS = os.getenv("PAYGRADE_EMBEDDING_MULTI_PROCESS", "0") == "1"
+# When set, a non-torch backend is checked against the torch reference at load time and
+# replaced by it if any sample drops below EMBEDDING_COSINE_TOLERANCE.
+EMBEDDING_VERIFY = os.getenv("PAYGRADE_EMBEDDING_VERIFY", "0") == "1"
+EMBEDDING_COSINE_TOLERANCE = float(os.getenv("PAYGRADE_EMBEDDING_COSINE_TOLERANCE", "0.99"))
+
+# --- FAISS INDEX ---
+# "flat" (exact), "ivf", "ivfpq" or "hnsw". Changing the type or its build parameters rebuilds the index.
+FAISS_INDEX_TYPE = os.getenv("PAYGRADE_FAISS_INDEX_TYPE", "flat")
+FAISS_NLIST = int(os.getenv("PAYGRADE_FAISS_NLIST", "256"))
+FAISS_PQ_M = int(os.getenv("PAYGRADE_FAISS_PQ_M", "48"))
+FAISS_PQ_NBITS = int(os.getenv("PAYGRADE_FAISS_PQ_NBITS", "8"))
+FAISS_HNSW_M = int(os.getenv("PAYGRADE_FAISS_HNSW_M", "32"))
+FAISS_TRAIN_SAMPLE = int(os.getenv("PAYGRADE_FAISS_TRAIN_SAMPLE", "20000"))
+# Search-time knobs; applied every time the index is loaded.
+FAISS_NPROBE = int(os.getenv("PAYGRADE_FAISS_NPROBE", "16"))
+FAISS_EF_SEARCH = int(os.getenv("PAYGRADE_FAISS_EF_SEARCH", "64"))
+
+# --- SHARED READ-ONLY INDEX ---
+# "memory" keeps a private copy of the index per process; "mmap" attaches every worker to one
+# read-only, memory-mapped copy published under SHARED_INDEX_DIR.
+VECTOR_STORE_MODE = os.getenv("PAYGRADE_VECTOR_STORE_MODE", "memory")
+SHARED_INDEX_DIR = os.getenv("PAYGRADE_SHARED_INDEX_DIR", os.path.join(VECTOR_STORE_DIR, "shared"))
+
+# --- RETRIEVAL ---
+# "collection" keeps one index shard per document type (salary, negotiation, policy, general);
+# "none" keeps a single index. Shared mmap stores are always single and filter by document type instead.
+VECTOR_STORE_SHARDING = os.getenv("PAYGRADE_VECTOR_STORE_SHARDING", "collection")
+# Collections searched for salary estimates.
+SALARY_COLLECTIONS = [
+    name.strip() for name in os.getenv("PAYGRADE_SALARY_COLLECTIONS", "salary").split(",") if name.strip()
+]
+# Salary estimates prefer documents of the target location's region published within this many years,
+# and fall back to the whole salary collection when there are none.
+SALARY_MAX_AGE_YEARS = int(os.getenv("PAYGRADE_SALARY_MAX_AGE_YEARS", "3"))
+# Candidates scanned per query when a metadata filter applies to a single (unsharded) index.
+RETRIEVAL_FILTER_FETCH_K = int(os.getenv("PAYGRADE_RETRIEVAL_FILTER_FETCH_K", "200"))
+RETRIEVAL_TOP_K = int(os.getenv("PAYGRADE_RETRIEVAL_TOP_K", "4"))
+# Entries in each of the query embedding and top-k result caches.
+QUERY_CACHE_SIZE = int(os.getenv("PAYGRADE_QUERY_CACHE_SIZE", "1024"))
+
+# --- PROMPT BUDGETS (approximate tokens) ---
+CONTEXT_TOKEN_BUDGET = int(os.getenv("PAYGRADE_CONTEXT_TOKEN_BUDGET", "1200"))
+RESUME_TOKEN_BUDGET = int(os.getenv("PAYGRADE_RESUME_TOKEN_BUDGET", "3000"))
+# Share of a passage's word shingles already present in a better-ranked passage that marks it a duplicate.
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("PAYGRADE_CONTEXT_DEDUP_THRESHOLD", "0.8"))
+
+# --- AGENT MEMORY ---
+# Exchanges kept verbatim; older ones are folded into a running summary in the background.
+AGENT_MEMORY_TURNS = int(os.getenv("PAYGRADE_AGENT_MEMORY_TURNS", "4"))
+# Hard ceiling (approximate tokens) on the chat history sent with each agent turn.
+AGENT_MEMORY_MAX_TOKENS = int(os.getenv("PAYGRADE_AGENT_MEMORY_MAX_TOKENS", "1500"))
+AGENT_SUMMARY_MAX_TOKENS = int(os.getenv("PAYGRADE_AGENT_SUMMARY_MAX_TOKENS", "300"))
+
+# --- AGENT EXECUTION ---
+AGENT_MAX_ITERATIONS = int(os.getenv("PAYGRADE_AGENT_MAX_ITERATIONS", "5"))
+AGENT_MAX_EXECUTION_SECONDS = float(os.getenv("PAYGRADE_AGENT_MAX_EXECUTION_SECONDS", "60"))
+# Answer simple knowledge-base questions with one retrieve-then-answer call instead of the ReAct loop.
+AGENT_FAST_PATH = os.getenv("PAYGRADE_AGENT_FAST_PATH", "1") == "1"
+TOOL_CACHE_SIZE = int(os.getenv("PAYGRADE_TOOL_CACHE_SIZE", "256"))
+TOOL_CACHE_TTL_SECONDS = int(os.getenv("PAYGRADE_TOOL_CACHE_TTL_SECONDS", "900"))
+
+# --- LLM GATEWAY ---
+# Provider quota of the API key (Groq's llama3-70b-8192 limits by default).
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("PAYGRADE_LLM_REQUESTS_PER_MINUTE", "30"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("PAYGRADE_LLM_TOKENS_PER_MINUTE", "6000"))
+# Share of each quota bucket that batch calls leave free for interactive ones.
+LLM_INTERACTIVE_RESERVE = float(os.getenv("PAYGRADE_LLM_INTERACTIVE_RESERVE", "0.2"))
+# Completion tokens assumed per call before the provider reports actual usage.
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("PAYGRADE_LLM_COMPLETION_TOKEN_ESTIMATE", "400"))
+LLM_MAX_RETRIES = int(os.getenv("PAYGRADE_LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_SECONDS = float(os.getenv("PAYGRADE_LLM_BACKOFF_SECONDS", "2"))
+LLM_MAX_BACKOFF_SECONDS = float(os.getenv("PAYGRADE_LLM_MAX_BACKOFF_SECONDS", "60"))
+# Share of the quota this process may use. Rate limits and priorities are enforced per process, so
+# when app replicas and batch runs share one API key, give each a share and keep the sum at most 1
+# (e.g. 0.4 for each of two app replicas and 0.2 for batch_resumes.py --rate-share).
+LLM_RATE_SHARE = float(os.getenv("PAYGRADE_LLM_RATE_SHARE", "1.0"))
+
+# --- OFFER COMPARISON ---
+# Offer figures are converted to OFFER_BASE_CURRENCY using static "CODE=rate" pairs (INR per unit of
+# each currency); update the rates when comparing foreign offers.
+OFFER_BASE_CURRENCY = os.getenv("PAYGRADE_OFFER_BASE_CURRENCY", "INR")
+CURRENCY_RATES_TO_INR = {
+    code.strip().upper(): float(rate) for code, rate in (
+        pair.split("=") for pair in os.getenv(
+            "PAYGRADE_CURRENCY_RATES_TO_INR", "INR=1,USD=83,EUR=90,GBP=105,SGD=62,AED=22.6,CAD=61,AUD=55"
+        ).split(",") if "=" in pair
+    )
+}
+
+# --- PDF UPLOADS ---
+# Uploads larger than this are rejected before parsing.
+PDF_MAX_BYTES = int(os.getenv("PAYGRADE_PDF_MAX_BYTES", str(20 * 1024 * 1024)))
+# Only the first PDF_MAX_PAGES pages are read; extraction also stops once PDF_MAX_CHARS characters are collected.
+PDF_MAX_PAGES = int(os.getenv("PAYGRADE_PDF_MAX_PAGES", "50"))
+PDF_MAX_CHARS = int(os.getenv("PAYGRADE_PDF_MAX_CHARS", "200000"))
+# Worker processes for page-parallel extraction of documents with at least PDF_PARALLEL_MIN_PAGES pages;
+# 1 keeps extraction serial and in-process.
+PDF_PARSE_WORKERS = int(os.getenv("PAYGRADE_PDF_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PAYGRADE_PDF_PARALLEL_MIN_PAGES", "16"))
+PDF_PAGES_PER_TASK = int(os.getenv("PAYGRADE_PDF_PAGES_PER_TASK", "8"))
@@ -1,15 +1,137 @@
 # models/embeddings.py
 
+import atexit
+import argparse
+import threading
+from typing import Any
+import numpy as np
+from pydantic import PrivateAttr
 from langchain_huggingface import HuggingFaceEmbeddings
+from config.config import (
+    EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND, EMBEDDING_BATCH_SIZE, EMBEDDING_THREADS,
+    EMBEDDING_MULTI_PROCESS, EMBEDDING_VERIFY, EMBEDDING_COSINE_TOLERANCE
+)
 
-def get_embedding_model():
+# Representative texts used to compare a backend against the PyTorch reference.
+VERIFICATION_SENTENCES = [
+    "What is the salary range for a Senior Data Scientist in Bengaluru, India?",
+    "Median CTC for a backend developer with 3-5 years of experience is 14 LPA.",
+    "Negotiation tip: anchor with a well-researched number and justify it with market data.",
+    "The offer includes a joining bonus, annual variable pay of 15% and ESOPs vesting over four years.",
+    "Python, Pandas, PyTorch, FAISS, LangChain, Docker, Kubernetes, AWS",
+]
+
+class BackendEmbeddings(HuggingFaceEmbeddings):
+    """
+    HuggingFaceEmbeddings that records the backend running the model, so stored vectors and cached
+    query vectors from another backend are not reused. With multi_process, documents are encoded by
+    one worker pool started on first use and kept for the life of the process (the base class starts
+    and stops a pool on every call), honouring the configured batch_size; queries stay in-process.
+    """
+
+    backend: str = "torch"
+    _pool: Any = PrivateAttr(default=None)
+    _pool_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = self._client.start_multi_process_pool()
+                atexit.register(self.close_pool)
+            return self._pool
+
+    def close_pool(self):
+        """Stops the multi-process worker pool, if one was started."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            self._client.stop_multi_process_pool(pool)
+
+    def _encode(self, texts, encode_kwargs):
+        texts = [text.replace("\n", " ") for text in texts]
+        if self.multi_process and len(texts) > 1:
+            embeddings = self._client.encode_multi_process(texts, self._get_pool(), **encode_kwargs)
+        else:
+            embeddings = self._client.encode(texts, show_progress_bar=self.show_progress, **encode_kwargs)
+        return embeddings.tolist()
+
+    def embed_documents(self, texts):
+        return self._encode(texts, self.encode_kwargs)
+
+    def embed_query(self, text):
+        return self._encode([text], self.query_encode_kwargs or self.encode_kwargs)[0]
+
+def _onnx_model_kwargs(threads):
+    """ONNX Runtime options passed through sentence-transformers to the ONNX session."""
+    model_kwargs = {"provider": "CPUExecutionProvider"}
+    if threads:
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = threads
+        model_kwargs["session_options"] = session_options
+    return model_kwargs
+
+def get_embedding_model(backend=EMBEDDING_BACKEND, batch_size=EMBEDDING_BATCH_SIZE, threads=EMBEDDING_THREADS,
+                        multi_process=EMBEDDING_MULTI_PROCESS, verify=EMBEDDING_VERIFY):
     """
     Initializes and returns the HuggingFace embedding model.
+    backend is "torch" (default), "onnx" (ONNX Runtime) or "int8" (dynamically quantized Linear layers);
+    all three run the same all-MiniLM-L6-v2 weights on CPU.
     """
     # This specifies the model to use. "all-MiniLM-L6-v2" is a great, lightweight default.
-    model_name = "all-MiniLM-L6-v2"
-    
+    model_name = EMBEDDING_MODEL_NAME
+
+    model_kwargs = {"device": "cpu"}
+    if backend == "onnx":
+        model_kwargs.update({"backend": "onnx", "model_kwargs": _onnx_model_kwargs(threads)})
+    elif threads:
+        import torch
+
+        torch.set_num_threads(threads)
+
     # The model will be downloaded automatically on the first run and cached for future use.
-    embedding_model = HuggingFaceEmbeddings(model_name=model_name)
-    
-    return embedding_model
\ No newline at end of file
+    embedding_model = BackendEmbeddings(
+        model_name=model_name,
+        model_kwargs=model_kwargs,
+        encode_kwargs={"batch_size": batch_size},
+        multi_process=multi_process,
+        backend=backend,
+    )
+
+    if backend == "int8":
+        import torch
+
+        torch.quantization.quantize_dynamic(embedding_model._client, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+    if verify and backend != "torch":
+        passed, min_cosine = verify_embedding_backend(embedding_model)
+        if not passed:
+            print(f"Embedding backend '{backend}' drifted from the reference (min cosine {min_cosine:.4f}); using torch instead.")
+            embedding_model.close_pool()
+            return get_embedding_model("torch", batch_size, threads, multi_process, verify=False)
+
+    return embedding_model
+
+def verify_embedding_backend(candidate, reference=None, sentences=VERIFICATION_SENTENCES, tolerance=EMBEDDING_COSINE_TOLERANCE):
+    """
+    Checks that a candidate embedding model stays within a cosine tolerance of the PyTorch reference.
+    Returns (passed, min_cosine) over the sample sentences.
+    """
+    if reference is None:
+        reference = get_embedding_model("torch", threads=0, multi_process=False, verify=False)
+    candidate_vectors = np.asarray(candidate.embed_documents(sentences), dtype=np.float32)
+    reference_vectors = np.asarray(reference.embed_documents(sentences), dtype=np.float32)
+    cosines = np.sum(candidate_vectors * reference_vectors, axis=1) / (
+        np.linalg.norm(candidate_vectors, axis=1) * np.linalg.norm(reference_vectors, axis=1)
+    )
+    min_cosine = float(cosines.min())
+    return min_cosine >= tolerance, min_cosine
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check an embedding backend against the PyTorch reference.")
+    parser.add_argument("--backend", choices=["onnx", "int8"], default="onnx")
+    parser.add_argument("--tolerance", type=float, default=EMBEDDING_COSINE_TOLERANCE)
+    args = parser.parse_args()
+    passed, min_cosine = verify_embedding_backend(get_embedding_model(args.backend, verify=False), tolerance=args.tolerance)
+    print(f"{args.backend}: min cosine {min_cosine:.4f} vs torch -> {'OK' if passed else 'FAILED'}")
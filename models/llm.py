@@ -2,6 +2,8 @@ import os
 import sys
 from langchain_groq import ChatGroq
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from utils.metrics import MetricsCallbackHandler
+from utils.llm_gateway import with_gateway
 
 
 def get_chatgroq_model():
@@ -11,7 +13,8 @@ def get_chatgroq_model():
         groq_model = ChatGroq(
             api_key="",
             model="",
+            max_retries=0,
         )
-        return groq_model
+        return with_gateway(groq_model, callbacks=[MetricsCallbackHandler("llm.groq")])
     except Exception as e:
         raise RuntimeError(f"Failed to initialize Groq model: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,71 @@
+import json
+import batch_resumes
+from batch_resumes import Checkpoint, run_batch, iter_resume_paths
+
+def _fake_process(failing):
+    calls = []
+
+    def process(path, llm, **kwargs):
+        calls.append(path)
+        status = "error" if path in failing else "ok"
+        return {"path": path, "status": status}
+    return process, calls
+
+def _read_records(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_checkpoint_persists_resolved_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    checkpoint = Checkpoint(str(tmp_path / "out.jsonl.checkpoint"))
+    checkpoint.mark_done("a.pdf")
+    checkpoint.mark_done("./a.pdf")
+    checkpoint.close()
+
+    reloaded = Checkpoint(str(tmp_path / "out.jsonl.checkpoint"))
+    assert reloaded.is_done(str(tmp_path / "a.pdf"))
+    assert not reloaded.is_done("b.pdf")
+    reloaded.close()
+
+def test_resume_skips_finished_files_after_inputs_change(tmp_path, monkeypatch):
+    output = str(tmp_path / "out.jsonl")
+    process, calls = _fake_process(failing=set())
+    monkeypatch.setattr(batch_resumes, "process_resume", process)
+    assert run_batch(["/docs/b.pdf", "/docs/c.pdf"], output, llm=None, concurrency=2) == (2, 0)
+
+    # A new file sorts first, shifting every position; only it should be processed.
+    calls.clear()
+    assert run_batch(["/docs/a.pdf", "/docs/b.pdf", "/docs/c.pdf"], output, llm=None, concurrency=2) == (1, 0)
+    assert calls == ["/docs/a.pdf"]
+    assert [record["path"] for record in _read_records(output)].count("/docs/b.pdf") == 1
+
+def test_partial_last_line_is_not_glued_to_the_next_record(tmp_path, monkeypatch):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"path": "/docs/a.pdf", "sta')
+    process, calls = _fake_process(failing=set())
+    monkeypatch.setattr(batch_resumes, "process_resume", process)
+    assert run_batch(["/docs/b.pdf"], str(output), llm=None, concurrency=1) == (1, 0)
+    lines = output.read_text().splitlines()
+    assert lines[0] == '{"path": "/docs/a.pdf", "sta'
+    assert json.loads(lines[1])["path"] == "/docs/b.pdf"
+
+def test_failed_resumes_are_retried(tmp_path, monkeypatch):
+    output = str(tmp_path / "out.jsonl")
+    process, calls = _fake_process(failing={"/docs/b.pdf"})
+    monkeypatch.setattr(batch_resumes, "process_resume", process)
+    assert run_batch(["/docs/a.pdf", "/docs/b.pdf"], output, llm=None, concurrency=1) == (2, 1)
+
+    process_ok, calls = _fake_process(failing=set())
+    monkeypatch.setattr(batch_resumes, "process_resume", process_ok)
+    assert run_batch(["/docs/a.pdf", "/docs/b.pdf"], output, llm=None, concurrency=1) == (1, 0)
+    assert calls == ["/docs/b.pdf"]
+
+def test_iter_resume_paths_reads_manifest_and_walks_sorted(tmp_path):
+    (tmp_path / "z").mkdir()
+    for name in ("z/b.pdf", "a.PDF", "notes.txt"):
+        (tmp_path / name).write_text("")
+    assert list(iter_resume_paths(str(tmp_path))) == [str(tmp_path / "a.PDF"), str(tmp_path / "z" / "b.pdf")]
+
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# resumes\none.pdf\n\n  two.pdf  \n")
+    assert list(iter_resume_paths(manifest=str(manifest))) == ["one.pdf", "two.pdf"]
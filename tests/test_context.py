@@ -0,0 +1,34 @@
+from langchain_core.documents import Document
+from utils.context import assemble_context, estimate_tokens, truncate_to_tokens
+
+TEXT = " ".join(f"word{i}" for i in range(120))
+
+def _chunk(start, end, **metadata):
+    return Document(page_content=TEXT[start:end], metadata={"source": "guide.pdf", "page": 0, **metadata})
+
+def test_chain_of_overlapping_chunks_collapses_into_one_passage():
+    # a overlaps b and b overlaps c, but a and c do not overlap; b ranks last.
+    a, b, c = _chunk(0, 300), _chunk(250, 550), _chunk(500, 800)
+    context, _ = assemble_context([a, c, b], max_tokens=1000)
+    assert context == TEXT[0:800].strip()
+
+def test_chunks_are_ordered_by_start_index_before_merging():
+    docs = [_chunk(500, 800, start_index=500), _chunk(0, 300, start_index=0), _chunk(250, 550, start_index=250)]
+    context, _ = assemble_context(docs, max_tokens=1000)
+    assert context == TEXT[0:800].strip()
+
+def test_chunks_from_other_pages_are_not_merged():
+    docs = [_chunk(0, 300), _chunk(250, 550, page=1)]
+    context, _ = assemble_context(docs, max_tokens=1000)
+    assert context == TEXT[0:300].strip() + "\n\n" + TEXT[250:550].strip()
+
+def test_context_respects_token_budget():
+    docs = [Document(page_content=f"passage {i} " + "x" * 400, metadata={"source": f"{i}.pdf"}) for i in range(5)]
+    context, tokens = assemble_context(docs, max_tokens=250)
+    assert tokens <= 250
+    assert estimate_tokens(context) <= 250
+    assert context.startswith("passage 0")
+
+def test_truncate_to_tokens_prefers_word_boundary():
+    text = truncate_to_tokens("alpha beta gamma delta epsilon", 3)
+    assert text == "alpha beta"
@@ -0,0 +1,47 @@
+import json
+import pytest
+from benchmarks.corpus import write_pdf
+from utils.doc_metadata import classify_document, detect_region, tag_documents
+
+def _pdf(tmp_path, name, lines):
+    path = tmp_path / name
+    write_pdf(str(path), [lines])
+    return str(path)
+
+@pytest.mark.parametrize("text", [
+    "Salary Guide India 2024", "Software salaries in Bengaluru", "BANGALORE pay bands", "Median CTC 18 LPA",
+    "MP_IN_salary_guide", "Pay in Lakhs per annum",
+])
+def test_detect_region_india_in_any_case(text):
+    assert detect_region(text) == "india"
+
+@pytest.mark.parametrize("text", ["Global Salary Guide", "pay in london", "Log in to view", "Indiana wages"])
+def test_detect_region_global(text):
+    assert detect_region(text) == "global"
+
+def test_classify_document_from_capitalised_file_name(tmp_path):
+    path = _pdf(tmp_path, "Salary Guide Bengaluru 2024.pdf", ["Compensation benchmarks"])
+    assert classify_document(path, "Salary Guide Bengaluru 2024.pdf") == {
+        "source": "Salary Guide Bengaluru 2024.pdf", "doc_type": "salary", "region": "india", "year": 2024,
+    }
+
+def test_classify_document_from_page_text(tmp_path):
+    path = _pdf(tmp_path, "report.pdf", ["Remuneration Trends", "Data for Mumbai and Pune, published 2023"])
+    metadata = classify_document(path, "guides/report.pdf")
+    assert (metadata["doc_type"], metadata["region"], metadata["year"]) == ("salary", "india", 2023)
+
+def test_negotiation_wins_over_salary_in_file_name(tmp_path):
+    path = _pdf(tmp_path, "HLS_PON_FR_SalaryNeg.pdf", ["How to ask for more"])
+    metadata = classify_document(path, "HLS_PON_FR_SalaryNeg.pdf")
+    assert (metadata["doc_type"], metadata["region"], metadata["year"]) == ("negotiation", "global", None)
+
+def test_tag_documents_caches_by_content_hash(tmp_path, monkeypatch):
+    _pdf(tmp_path, "Employee Handbook.pdf", ["Leave policy"])
+    cache_path = str(tmp_path / "tags" / "document_tags.json")
+    tags = tag_documents(str(tmp_path), {"Employee Handbook.pdf": "sha-1"}, cache_path)
+    assert tags["Employee Handbook.pdf"]["doc_type"] == "policy"
+
+    monkeypatch.setattr("utils.doc_metadata.classify_document", lambda *args: pytest.fail("re-classified"))
+    assert tag_documents(str(tmp_path), {"Employee Handbook.pdf": "sha-1"}, cache_path) == tags
+    with open(cache_path, "r", encoding="utf-8") as f:
+        assert json.load(f)["files"]["Employee Handbook.pdf"]["sha256"] == "sha-1"
@@ -0,0 +1,13 @@
+import numpy as np
+from utils.faiss_index import build_index, index_kind, recall_report
+
+def test_recall_report_labels_rows_with_the_index_actually_built():
+    vectors = np.random.default_rng(0).random((200, 32), dtype=np.float32)
+    report = recall_report(vectors, vectors[:10], configs=[{"kind": "ivfpq", "nprobe": 4}, {"kind": "hnsw"}])
+    # Too few vectors to train IVF-PQ, so build_index falls back to flat.
+    assert [(row["kind"], row.get("requested_kind")) for row in report] == [("flat", None), ("flat", "ivfpq"), ("hnsw", "hnsw")]
+    assert report[1]["nprobe"] is None and report[1]["recall_at_k"] == 1.0
+
+def test_index_kind_names_each_index_type():
+    vectors = np.random.default_rng(0).random((400, 16), dtype=np.float32)
+    assert [index_kind(build_index(kind, vectors, nlist=4)) for kind in ("flat", "ivf", "hnsw")] == ["flat", "ivf", "hnsw"]
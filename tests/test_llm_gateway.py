@@ -0,0 +1,94 @@
+import threading
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+from benchmarks.fakes import FakeChatGroq
+from utils import llm_gateway
+from utils.llm_gateway import TokenBucket, LLMGateway, GatewayChatModel
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+def test_token_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(60)
+    bucket.updated = 0.0
+    bucket.level = 0.0
+    bucket.refill(10.0)
+    assert bucket.level == pytest.approx(10.0)
+    bucket.refill(1000.0)
+    assert bucket.level == 60.0
+
+def test_token_bucket_wait_time_scales_with_rate():
+    bucket = TokenBucket(60)
+    bucket.level = 0.0
+    assert bucket.wait_time(5) == pytest.approx(5.0)
+    assert bucket.wait_time(5, scale=0.5) == pytest.approx(10.0)
+    bucket.level = 10.0
+    assert bucket.wait_time(5) == 0.0
+
+def test_batch_callers_leave_the_interactive_reserve(monkeypatch):
+    monkeypatch.setattr(llm_gateway.time, "monotonic", _Clock().monotonic)
+    gateway = LLMGateway(requests_per_minute=10, tokens_per_minute=1000, interactive_reserve=0.2)
+    gateway.requests.level = 2.5
+    now = llm_gateway.time.monotonic()
+    # A batch call needs one request plus 20% of the bucket (2) free; an interactive one only needs one.
+    assert gateway._wait_time(100, "batch", now) > 0
+    assert gateway._wait_time(100, "interactive", now) == 0
+
+def test_large_batch_call_waits_for_a_full_bucket_not_forever(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(llm_gateway.time, "monotonic", clock.monotonic)
+    gateway = LLMGateway(requests_per_minute=30, tokens_per_minute=6000, interactive_reserve=0.2, rate_share=0.2)
+    assert gateway.tokens.capacity == 1200
+    # 3000 tokens plus the 20% reserve is more than the bucket can ever hold; a full bucket must do.
+    gateway.tokens.level = 0.0
+    assert gateway._wait_time(3000, "batch", clock.now) == pytest.approx(60.0)
+    # 1000 tokens is above the unreserved 80% but below capacity.
+    clock.now += 60.0
+    assert gateway._wait_time(1000, "batch", clock.now) == 0
+
+def test_rate_share_splits_the_quota():
+    gateway = LLMGateway(requests_per_minute=30, tokens_per_minute=6000, rate_share=0.25)
+    assert gateway.requests.capacity == 7.5
+    assert gateway.tokens.capacity == 1500
+    with pytest.raises(ValueError):
+        LLMGateway(rate_share=0)
+
+def test_rate_limit_pauses_and_halves_the_rate(monkeypatch):
+    monkeypatch.setattr(llm_gateway.time, "monotonic", _Clock().monotonic)
+    gateway = LLMGateway(max_retries=1)
+    error = type("RateLimitError", (Exception,), {})()
+    gateway.record_rate_limit(error)
+    assert gateway._rate_scale == 0.5
+    assert gateway._blocked_until > llm_gateway.time.monotonic()
+    gateway.record_success()
+    assert gateway._rate_scale == pytest.approx(0.55)
+
+class _TokenRecorder(BaseCallbackHandler):
+    def __init__(self):
+        self.tokens = []
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.tokens.append(token)
+
+def test_coalesced_callers_get_the_answer_through_their_own_callbacks(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "_gateway", LLMGateway())
+    model = GatewayChatModel(llm=FakeChatGroq(latency_seconds=0.2))
+    recorders = [_TokenRecorder() for _ in range(4)]
+    results = [None] * 4
+
+    def ask(i):
+        results[i] = model.invoke("salary for a data scientist", config={"callbacks": [recorders[i]]}).content
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(results)) == 1
+    # The fake model does not stream inside _generate, so only the followers see a replayed token.
+    assert sum(recorder.tokens == [results[0]] for recorder in recorders) == 3
@@ -0,0 +1,34 @@
+import threading
+from types import SimpleNamespace
+from langchain_core.messages import HumanMessage, AIMessage
+from agents.memory import ConversationMemory
+
+class _BlockingLLM:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def invoke(self, prompt):
+        self.release.wait(5)
+        return SimpleNamespace(content="User is a data scientist in Pune.")
+
+def _turns(count):
+    messages = []
+    for i in range(count):
+        messages += [HumanMessage(content=f"question {i}"), AIMessage(content=f"answer {i}")]
+    return messages
+
+def test_messages_awaiting_summary_are_sent_verbatim():
+    llm = _BlockingLLM()
+    memory = ConversationMemory(llm, recent_turns=1, max_tokens=500, summary_tokens=50)
+    messages = _turns(3)
+    history = memory.chat_history(messages)
+    # Turns 0 and 1 left the window but their summary is still in flight.
+    assert "question 0" in history and "answer 1" in history and "answer 2" in history
+
+    llm.release.set()
+    for thread in threading.enumerate():
+        if thread.name == "agent-memory-summary":
+            thread.join(5)
+    history = memory.chat_history(messages)
+    assert history.startswith("Summary of earlier conversation: User is a data scientist in Pune.")
+    assert "question 0" not in history and "answer 2" in history
@@ -0,0 +1,87 @@
+import math
+import pytest
+from utils.offers import (
+    detect_currency, parse_money, normalize_offer, offers_frame, rank_offers, add_market_percentiles, export_offers
+)
+
+@pytest.mark.parametrize("text, expected", [
+    ("18,00,000 per annum", 1_800_000),
+    ("18 LPA", 1_800_000),
+    ("$12k/month", 144_000),
+    ("1.2 Cr", 12_000_000),
+    ("1000 RSUs worth $40,000", 40_000),
+    ("4-year vesting of 20 lakhs", 2_000_000),
+])
+def test_parse_money(text, expected):
+    assert parse_money(text) == pytest.approx(expected)
+
+@pytest.mark.parametrize("text", ["1000 RSUs", "2 years cliff", "5000 stock options", "", None, "Not mentioned"])
+def test_parse_money_ignores_share_counts_and_durations(text):
+    assert math.isnan(parse_money(text))
+
+def test_parse_money_percentage_of_base():
+    assert parse_money("10% of base", base_amount=1_000_000) == pytest.approx(100_000)
+
+@pytest.mark.parametrize("text, expected", [
+    ("S$8,000", "SGD"), ("$120,000", "USD"), ("Rs. 12,00,000", "INR"), ("Indian Rupees", "INR"),
+    ("₹", "INR"), ("1000 RSUs", ""), ("€50k", "EUR"), ("HK$500,000", "HKD"), ("¥10,000,000", "JPY"),
+    ("CN¥300,000", "CNY"), ("CHF 150,000", "CHF"),
+])
+def test_detect_currency(text, expected):
+    assert detect_currency(text) == expected
+
+@pytest.mark.parametrize("currency", ["Indian Rupees", "₹", "inr", "", None, "Rupees (INR)", "Not specified"])
+def test_normalize_offer_resolves_free_text_currency(currency):
+    row = normalize_offer({"currency": currency, "base_salary": "18 LPA", "total_ctc": "24 LPA"}, "a.pdf")
+    assert row["currency"] == "INR"
+    assert row["fx_rate"] == 1.0
+    assert row["ctc_annual"] == pytest.approx(2_400_000)
+
+@pytest.mark.parametrize("currency, base, expected", [
+    ("", "¥10,000,000", "JPY"), ("CHF", "CHF 150,000", "CHF"), ("Thai Baht", "1,200,000", "Thai Baht"),
+])
+def test_normalize_offer_leaves_unconfigured_currencies_unconverted(currency, base, expected):
+    row = normalize_offer({"currency": currency, "base_salary": base, "total_ctc": base}, "a.pdf")
+    assert row["currency"] == expected
+    assert math.isnan(row["fx_rate"])
+    assert math.isnan(row["base_annual"]) and math.isnan(row["ctc_annual"])
+
+def test_normalize_offer_converts_foreign_offers_and_sums_missing_ctc():
+    row = normalize_offer({"currency": "US Dollars", "base_salary": "$100,000", "bonus": "10% of base", "equity": "1000 RSUs"})
+    assert row["currency"] == "USD"
+    assert row["base_annual"] == pytest.approx(100_000 * 83)
+    assert row["ctc_annual"] == pytest.approx(110_000 * 83)
+    assert math.isnan(row["equity_annual"])
+
+def test_rank_offers_orders_by_weighted_score():
+    frame = offers_frame([
+        normalize_offer({"base_salary": "10 LPA", "total_ctc": "12 LPA"}, "low.pdf"),
+        normalize_offer({"base_salary": "20 LPA", "total_ctc": "25 LPA"}, "high.pdf"),
+        normalize_offer({"base_salary": "15 LPA", "total_ctc": "18 LPA"}, "mid.pdf"),
+    ])
+    ranked = rank_offers(frame)
+    assert list(ranked["file_name"]) == ["high.pdf", "mid.pdf", "low.pdf"]
+    assert list(ranked["rank"]) == [1, 2, 3]
+    # Best on CTC and base (0.5 + 0.3 of the weight); bonus and equity are missing and score 0.
+    assert ranked["score"].iloc[0] == pytest.approx(0.8)
+    assert list(rank_offers(frame, {"ctc_annual": -1})["file_name"])[0] == "low.pdf"
+
+def test_market_percentile_is_linear_between_table_points(monkeypatch):
+    row = {
+        "min_pay": 1_000_000, "median_pay": 2_000_000, "max_pay": 4_000_000, "source": "guide.pdf",
+        "location": "mumbai", "location_found": False,
+    }
+    monkeypatch.setattr("utils.offers.lookup_salary", lambda role, location: row)
+    frame = offers_frame([
+        normalize_offer({"role": "Data Scientist", "total_ctc": ctc}, name)
+        for name, ctc in [("a", "15 LPA"), ("b", "30 LPA"), ("c", "50 LPA")]
+    ])
+    market = add_market_percentiles(frame)
+    assert list(market["market_percentile"]) == pytest.approx([25, 75, 100])
+    assert not market["market_location_found"].any()
+
+def test_export_offers_csv_bytes():
+    frame = offers_frame([normalize_offer({"company": "Acme", "total_ctc": "12 LPA"}, "a.pdf")])
+    assert export_offers(frame, "csv").decode().splitlines()[1].startswith("a.pdf,Acme")
+    with pytest.raises(ValueError):
+        export_offers(frame, "xlsx")
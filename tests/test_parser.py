@@ -0,0 +1,50 @@
+import io
+import os
+import pytest
+from benchmarks.corpus import write_pdf
+from utils import parser
+from utils.parser import iter_pdf_pages, extract_text_from_pdf
+
+@pytest.fixture
+def long_pdf(tmp_path):
+    path = str(tmp_path / "long.pdf")
+    write_pdf(path, [[f"Page {page} line {line}" for line in range(3)] for page in range(40)])
+    return path
+
+def test_parallel_extraction_matches_serial_order(long_pdf, monkeypatch):
+    monkeypatch.setattr(parser, "PDF_PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(parser, "PDF_PAGES_PER_TASK", 3)
+    serial = list(iter_pdf_pages(long_pdf, max_pages=0, workers=1))
+    assert len(serial) == 40
+    assert list(iter_pdf_pages(long_pdf, max_pages=0, workers=2)) == serial
+    with open(long_pdf, "rb") as f:
+        data = f.read()
+    assert list(iter_pdf_pages(data, max_pages=0, workers=2)) == serial
+
+def test_uploads_are_spooled_once_and_cleaned_up(long_pdf, monkeypatch, tmp_path):
+    monkeypatch.setattr(parser, "PDF_PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(parser.tempfile, "tempdir", str(tmp_path / "spool"))
+    os.makedirs(tmp_path / "spool")
+    with open(long_pdf, "rb") as f:
+        pages = iter_pdf_pages(io.BytesIO(f.read()), max_pages=0, workers=2)
+        assert next(pages).startswith("Page 0")
+        assert len(os.listdir(tmp_path / "spool")) == 1
+        pages.close()
+    assert os.listdir(tmp_path / "spool") == []
+
+def test_page_cap(long_pdf):
+    assert len(list(iter_pdf_pages(long_pdf, max_pages=5, workers=1))) == 5
+
+def test_size_cap_rejects_before_parsing(long_pdf):
+    with pytest.raises(ValueError, match="limit"):
+        next(iter_pdf_pages(long_pdf, max_bytes=100))
+    assert extract_text_from_pdf(b"%PDF" + b"x" * (parser.PDF_MAX_BYTES + 1)).startswith("Error reading PDF: the file is")
+
+def test_extract_text_stops_at_max_chars(long_pdf):
+    text = extract_text_from_pdf(long_pdf, max_chars=100)
+    assert len(text) == 100
+    assert text.startswith("Page 0 line 0")
+
+def test_extract_text_reports_unreadable_files():
+    assert extract_text_from_pdf(b"not a pdf").startswith("Error reading PDF:")
+    assert extract_text_from_pdf(None) is None
@@ -0,0 +1,47 @@
+from datetime import date
+import pytest
+from utils.resume_extractor import (
+    compute_experience_years, extract_date_ranges, extract_links, extract_phone, extract_resume_fields
+)
+
+TODAY = date(2026, 10, 17)
+
+@pytest.mark.parametrize("text, expected", [
+    ("Engineer, Acme 2019 - 2020", "2 years"),
+    ("Engineer, Acme 2018 - 2022", "5 years"),
+    ("Engineer, Acme 2025 - 2026", "2 years"),
+    ("Engineer, Acme Jan 2020 - Jun 2021", "1.5 years"),
+    ("Engineer, Acme 03/2024 - Present", "2.5 years"),
+])
+def test_experience_years(text, expected):
+    assert compute_experience_years(text, TODAY) == expected
+
+def test_year_only_end_date_covers_the_whole_year():
+    assert extract_date_ranges("2019 - 2020", TODAY) == [(2019, 1, 2020, 12)]
+    # In the current year the range can only run to this month.
+    assert extract_date_ranges("2024 - 2026", TODAY) == [(2024, 1, 2026, 10)]
+
+def test_overlapping_roles_are_counted_once():
+    text = "Experience\nLead, Beta Jan 2020 - Dec 2021\nConsultant, Gamma Jun 2021 - Dec 2022\nEducation\nB.Tech 2015 - 2019"
+    assert compute_experience_years(text, TODAY) == "3 years"
+
+def test_future_and_reversed_ranges_are_ignored():
+    assert compute_experience_years("Intern 2027 - 2028\nAnalyst 2022 - 2020", TODAY) == ""
+
+def test_extract_phone_skips_date_ranges_and_short_numbers():
+    assert extract_phone("Worked 2019 - 2020, id 12345") == ""
+    assert extract_phone("Phone: +91 98765 43210") == "+91 98765 43210"
+
+def test_extract_links_names_profile_sites_and_dedupes():
+    links = extract_links("linkedin.com/in/jane https://www.linkedin.com/in/jane github.com/jane. https://jane.dev")
+    assert links == [
+        {"site": "LinkedIn", "url": "linkedin.com/in/jane"},
+        {"site": "GitHub", "url": "github.com/jane"},
+        {"site": "Website", "url": "https://jane.dev"},
+    ]
+
+def test_extract_resume_fields():
+    fields = extract_resume_fields("Jane Doe\njane.doe@example.com | 9876543210\nExperience\nSDE, Acme 2021 - 2022", TODAY)
+    assert fields == {
+        "email": "jane.doe@example.com", "phone": "9876543210", "links": [], "total_experience_years": "2 years",
+    }
@@ -0,0 +1,46 @@
+from langchain_community.vectorstores import FAISS
+from benchmarks.fakes import FakeEmbeddings
+from utils.rag_handler import search_documents
+from utils.doc_metadata import METADATA_VERSION
+from utils.sharded_store import ShardedVectorStore
+
+EMBEDDINGS = FakeEmbeddings(dimension=32)
+
+def _store(chunks, tagged=True):
+    texts = [text for text, _ in chunks]
+    store = FAISS.from_texts(texts, EMBEDDINGS, metadatas=[metadata for _, metadata in chunks])
+    if tagged:
+        store.index_settings = {"metadata_version": METADATA_VERSION}
+    return store
+
+def _tag(doc_type, region="india", year=2025):
+    return {"doc_type": doc_type, "region": region, "year": year}
+
+def test_collection_filter_does_not_fall_back_to_other_collections():
+    store = _store([("anchor high and justify it", _tag("negotiation")), ("leave policy", _tag("policy"))])
+    assert search_documents("data scientist salary", store, collections=["salary"]) == []
+
+def test_untagged_index_is_searched_without_filter():
+    store = _store([("data scientist pay", {}), ("leave policy", {})], tagged=False)
+    assert len(search_documents("data scientist salary", store, k=2, collections=["salary"])) == 2
+
+def test_region_and_year_are_preferences_within_the_collection():
+    store = _store([
+        ("pay in bengaluru", _tag("salary", "india", 2025)),
+        ("pay in london", _tag("salary", "global", 2025)),
+        ("old pay in pune", _tag("salary", "india", 2015)),
+        ("negotiate pay", _tag("negotiation", "india", 2025)),
+    ])
+    docs = search_documents("pay", store, k=4, collections=["salary"], region="india", min_year=2023)
+    assert [doc.page_content for doc in docs] == ["pay in bengaluru"]
+    docs = search_documents("pay", store, k=4, collections=["salary"], region="india", min_year=2030)
+    assert sorted(doc.page_content for doc in docs) == ["old pay in pune", "pay in bengaluru", "pay in london"]
+
+def test_sharded_store_searches_only_requested_shards():
+    sharded = ShardedVectorStore({
+        "salary": _store([("pay in bengaluru", _tag("salary"))]),
+        "policy": _store([("leave policy", _tag("policy"))]),
+    }, EMBEDDINGS)
+    assert [doc.metadata["doc_type"] for doc in search_documents("pay", sharded, k=4, collections=["salary"])] == ["salary"]
+    assert search_documents("pay", sharded, collections=["negotiation"]) == []
+    assert len(search_documents("pay", sharded, k=4)) == 2
@@ -0,0 +1,65 @@
+import pytest
+from benchmarks.corpus import write_pdf
+from utils import salary_table
+from utils.salary_table import (
+    normalize_location, split_role, _parse_salary_line, build_salary_table, lookup_salary, format_salary_row
+)
+
+def test_normalize_location_maps_aliases_to_canonical_city():
+    assert normalize_location("Bangalore, India") == "bengaluru"
+    assert normalize_location("New Delhi NCR") == "delhi"
+    assert normalize_location("Remote") == ""
+
+def test_split_role_separates_seniority():
+    assert split_role("Senior Data Scientist") == ("data scientist", "senior")
+    assert split_role("Software Engineer") == ("software engineer", "")
+
+def test_parse_salary_line_reads_lakhs_on_lpa_pages():
+    row = _parse_salary_line("Data Scientist Bengaluru 8 - 14 - 22", "", 100_000)
+    assert row == {
+        "role": "data scientist", "seniority": "", "location": "bengaluru",
+        "min_pay": 800_000, "median_pay": 1_400_000, "max_pay": 2_200_000,
+    }
+
+def test_parse_salary_line_uses_experience_band_and_page_location():
+    row = _parse_salary_line("Backend Developer 3-5 years ₹6,00,000 ₹12,00,000", "pune", 1)
+    assert row["seniority"] == "mid"
+    assert row["location"] == "pune"
+    assert (row["min_pay"], row["median_pay"], row["max_pay"]) == (600_000, 900_000, 1_200_000)
+
+@pytest.mark.parametrize("line", ["Page 3 of 10", "Total 2023 2024", "Data Scientist 12 LPA"])
+def test_parse_salary_line_skips_non_rows(line):
+    assert _parse_salary_line(line, "", 100_000) is None
+
+@pytest.fixture
+def built_table(tmp_path, monkeypatch):
+    write_pdf(str(tmp_path / "guide.pdf"), [[
+        "Salaries in LPA",
+        "Senior Data Scientist Mumbai 20 - 30 - 45",
+        "Data Scientist Bengaluru 8 - 14 - 22",
+    ]])
+    output = tmp_path / "salary_table.json"
+    assert build_salary_table(str(tmp_path), ["guide.pdf", "missing.pdf"], str(output)) == 2
+    monkeypatch.setattr(salary_table, "_table", None)
+    salary_table.load_salary_table(str(output))
+    yield
+
+def test_lookup_salary_prefers_exact_match_and_falls_back(built_table):
+    exact = lookup_salary("Data Scientist", "Bengaluru")
+    assert exact["median_pay"] == 1_400_000
+    assert exact["matched_key"] == "data scientist||bengaluru" and exact["location_found"]
+    assert lookup_salary("Senior Data Scientist", "Mumbai")["median_pay"] == 3_000_000
+    # Unknown city: any location for the role and seniority, flagged as such.
+    fallback = lookup_salary("Senior Data Scientist", "Kolkata")
+    assert fallback["location"] == "mumbai"
+    assert fallback["matched_key"] == "data scientist|senior|" and not fallback["location_found"]
+    assert lookup_salary("Data Scientist")["location_found"]
+    assert lookup_salary("Product Manager") is None
+
+def test_format_salary_row(built_table):
+    text = format_salary_row(lookup_salary("Data Scientist", "Bangalore"))
+    assert text == "Data Scientist, Bengaluru: min ₹800,000, median ₹1,400,000, max ₹2,200,000 per year (source: guide.pdf)"
+
+def test_format_salary_row_says_when_location_not_found(built_table):
+    text = format_salary_row(lookup_salary("Senior Data Scientist", "Kolkata"))
+    assert text.endswith("Location not found: no figures for Kolkata; these are for Mumbai.")
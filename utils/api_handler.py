@@ -1,6 +1,8 @@
 import os
+import asyncio
 import requests
-import certifi
+from utils.http_client import request_json, normalize_query
+from config.config import JOOBLE_API_URL, JSEARCH_API_URL
 
 def get_market_salary_data(job_title, location):
     """
@@ -10,7 +12,6 @@ def get_market_salary_data(job_title, location):
     if not api_key:
         return "Error: JSEARCH_API_KEY not found in .env file."
 
-    url = "https://jsearch.p.rapidapi.com/search"
     querystring = {"query": f"salary for {job_title} in {location}", "num_pages": "1"}
     headers = {
         "X-RapidAPI-Key": api_key,
@@ -18,9 +19,10 @@ def get_market_salary_data(job_title, location):
     }
 
     try:
-        response = requests.get(url, headers=headers, params=querystring, verify=certifi.where())
-        response.raise_for_status()
-        results = response.json()
+        results = request_json(
+            "GET", JSEARCH_API_URL, headers=headers, params=querystring,
+            cache_key=("jsearch",) + normalize_query(job_title, location), stage="http.jsearch"
+        )
         jobs = results.get('data', [])
         
         if not jobs:
@@ -43,19 +45,19 @@ def get_market_salary_data(job_title, location):
             return "Found job listings, but could not extract specific salary range data."
 
     except requests.exceptions.HTTPError as http_err:
-        return f"An HTTP error occurred: {http_err} - {response.text}"
+        return f"An HTTP error occurred: {http_err} - {http_err.response.text}"
     except Exception as e:
         return f"An error occurred: {e}"
 
 def get_jooble_job_openings(job_title, location):
     """
-    Fetches similar job openings from the Jooble API, using certifi for SSL verification.
+    Fetches similar job openings from the Jooble API through the shared, cached HTTP client.
     """
     api_key = os.getenv("JOOBLE_API_KEY")
     if not api_key:
         return {"error": "JOOBLE_API_KEY not found in .env file."}
 
-    url = f"https://jooble.org/api/{api_key}"
+    url = f"{JOOBLE_API_URL}/{api_key}"
     headers = {"Content-Type": "application/json"}
     body = {
        "keywords": job_title,
@@ -63,11 +65,23 @@ def get_jooble_job_openings(job_title, location):
     }
 
     try:
-        response = requests.post(url, headers=headers, json=body, verify=certifi.where())
-        response.raise_for_status()
-        results = response.json()
+        results = request_json(
+            "POST", url, headers=headers, json=body,
+            cache_key=("jooble",) + normalize_query(job_title, location), stage="http.jooble"
+        )
         return results.get('jobs', [])
     except requests.exceptions.HTTPError as http_err:
-        return {"error": f"An HTTP error occurred: {http_err} - {response.text}"}
+        return {"error": f"An HTTP error occurred: {http_err} - {http_err.response.text}"}
     except Exception as e:
         return {"error": f"An error occurred: {e}"}
+
+async def get_job_market_data_async(job_title, location):
+    """
+    Queries Jooble and JSearch concurrently and returns both results. Each provider call runs on a
+    worker thread through request_json, so it shares the pooled session, retries and response cache.
+    """
+    job_openings, salary_data = await asyncio.gather(
+        asyncio.to_thread(get_jooble_job_openings, job_title, location),
+        asyncio.to_thread(get_market_salary_data, job_title, location),
+    )
+    return {"job_openings": job_openings, "salary_data": salary_data}
@@ -0,0 +1,83 @@
+import os
+import json
+import hashlib
+import time
+import threading
+from collections import OrderedDict
+from utils.metrics import record_cache
+
+def make_cache_key(*parts):
+    """Returns a stable content hash for the given JSON-serialisable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """
+    Thread-safe LRU cache keyed on content hashes, with an optional on-disk tier.
+    Values must be JSON-serialisable when a disk directory is configured.
+    Entries older than ttl_seconds (if given) are treated as missing.
+    """
+
+    def __init__(self, name, max_entries=256, disk_dir=None, ttl_seconds=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = os.path.join(disk_dir, name) if disk_dir else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def get(self, key, default=None):
+        value = self._get(key)
+        record_cache(self.name, value is not None)
+        return default if value is None else value
+
+    def _get(self, key):
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                stored_at, value = self._entries[key]
+                if self.ttl_seconds is None or now - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                stored_at = os.path.getmtime(path)
+                if self.ttl_seconds is not None and now - stored_at >= self.ttl_seconds:
+                    return None
+                with open(path, "r", encoding="utf-8") as f:
+                    value = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                return None
+            self._remember(key, value, stored_at)
+            return value
+        return None
+
+    def set(self, key, value):
+        self._remember(key, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(value, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Could not write {self.name} cache entry to disk: {e}")
+
+    def _remember(self, key, value, stored_at=None):
+        with self._lock:
+            self._entries[key] = (stored_at or time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,119 @@
+import re
+from utils.metrics import increment
+from config.config import CHUNK_OVERLAP, CONTEXT_TOKEN_BUDGET, CONTEXT_DEDUP_THRESHOLD
+
+# Characters per token for English prose with Groq's Llama tokenizer; good enough for budgeting.
+CHARS_PER_TOKEN = 4
+# Shortest shared edge that counts as splitter overlap rather than a coincidence.
+MIN_MERGE_OVERLAP = 20
+PASSAGE_SEPARATOR = "\n\n"
+
+def estimate_tokens(text):
+    """Approximates the token count of text without loading a tokenizer."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def truncate_to_tokens(text, max_tokens):
+    """Cuts text to roughly max_tokens, preferring to end on a line or word boundary."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    return cut[:boundary] if boundary > max_chars // 2 else cut
+
+def _overlap_length(left, right, max_overlap=CHUNK_OVERLAP):
+    """Length of the longest suffix of left that is also a prefix of right (0 if below MIN_MERGE_OVERLAP)."""
+    for length in range(min(len(left), len(right), max_overlap), MIN_MERGE_OVERLAP - 1, -1):
+        if left.endswith(right[:length]):
+            return length
+    return 0
+
+def _join(first, second):
+    """Joins two passages from the same page if one contains the other or their edges overlap; otherwise None."""
+    (rank, text, page_key), (other_rank, other_text, other_key) = first, second
+    if page_key != other_key:
+        return None
+    if other_text in text:
+        return min(rank, other_rank), text, page_key
+    if text in other_text:
+        return min(rank, other_rank), other_text, page_key
+    overlap = _overlap_length(text, other_text)
+    if overlap:
+        return min(rank, other_rank), text + other_text[overlap:], page_key
+    overlap = _overlap_length(other_text, text)
+    if overlap:
+        return min(rank, other_rank), other_text + text[overlap:], page_key
+    return None
+
+def _merge_neighbours(passages):
+    """
+    Joins chunks from the same page whose edges overlap, as produced by the text splitter, like
+    merging intervals: passages should arrive sorted by page and position, and merged passages are
+    compared again until nothing changes, so chains of overlapping chunks collapse into one.
+    A merged passage keeps the best (lowest) rank of its parts.
+    """
+    merged = list(passages)
+    changed = True
+    while changed:
+        changed = False
+        result = []
+        for passage in merged:
+            for position, other in enumerate(result):
+                joined = _join(other, passage)
+                if joined:
+                    result[position] = joined
+                    changed = True
+                    break
+            else:
+                result.append(passage)
+        merged = result
+    return merged
+
+def _shingles(text, size=3):
+    words = re.findall(r"\w+", text.lower())
+    return {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+
+def _drop_near_duplicates(passages, threshold=CONTEXT_DEDUP_THRESHOLD):
+    """
+    Drops passages whose word shingles are mostly contained in a better-ranked passage
+    (e.g. the same table in two reports, or a chunk already covered by a merged neighbour).
+    """
+    kept = []
+    for rank, text, page_key in sorted(passages, key=lambda passage: passage[0]):
+        shingles = _shingles(text)
+        if any(len(shingles & seen) / len(shingles) >= threshold for _, _, _, seen in kept):
+            continue
+        kept.append((rank, text, page_key, shingles))
+    return [(rank, text, page_key) for rank, text, page_key, _ in kept]
+
+def assemble_context(docs, max_tokens=CONTEXT_TOKEN_BUDGET, stage="rag.context"):
+    """
+    Turns retrieved chunks (most relevant first) into prompt context: merges overlapping
+    neighbours, drops near-duplicates, and packs passages in relevance order until the token
+    budget is spent. Returns (context, tokens_used); tokens used are also recorded under stage.
+    """
+    positioned = sorted(
+        (
+            (str(doc.metadata.get("source")), doc.metadata.get("page") or 0, doc.metadata.get("start_index", rank)),
+            (rank, doc.page_content.strip(), (doc.metadata.get("source"), doc.metadata.get("page"))),
+        )
+        for rank, doc in enumerate(docs) if doc.page_content.strip()
+    )
+    passages = _drop_near_duplicates(_merge_neighbours([passage for _, passage in positioned]))
+
+    packed, tokens_used = [], 0
+    separator_tokens = estimate_tokens(PASSAGE_SEPARATOR)
+    for _, text, _ in passages:
+        remaining = max_tokens - tokens_used - (separator_tokens if packed else 0)
+        tokens = estimate_tokens(text)
+        if tokens > remaining:
+            # Only the most relevant passage is truncated; later ones are skipped so a smaller one can still fit.
+            if packed or remaining <= 0:
+                continue
+            text = truncate_to_tokens(text, remaining)
+            tokens = estimate_tokens(text)
+        tokens_used += tokens + (separator_tokens if packed else 0)
+        packed.append(text)
+
+    increment("prompt_tokens", stage, tokens_used)
+    return PASSAGE_SEPARATOR.join(packed), tokens_used
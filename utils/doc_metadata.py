@@ -0,0 +1,87 @@
+import os
+import re
+import json
+from datetime import date
+import pypdf
+
+# Bump when the classification rules change so cached tags are recomputed.
+METADATA_VERSION = 2
+
+# Checked in order; the first match decides the collection ("HLS_PON_FR_SalaryNeg" is negotiation, not salary).
+DOC_TYPE_PATTERNS = [
+    ("negotiation", re.compile(r"negotiat|salaryneg|bargain", re.IGNORECASE)),
+    ("salary", re.compile(r"salary|salaries|wage|pay\s*structure|compensation|remuneration|\bctc\b|\blpa\b", re.IGNORECASE)),
+    ("policy", re.compile(r"policy|policies|handbook|code of conduct|leave rules|hr manual", re.IGNORECASE)),
+]
+DEFAULT_DOC_TYPE = "general"
+# Place names and Indian pay units match in any case; the "IN" country code only as a capitalised token.
+INDIA_PATTERN = re.compile(
+    r"(?i:\bindia\b|\bindian\b|bengaluru|bangalore|mumbai|hyderabad|pune|chennai|gurugram|gurgaon|noida|delhi|\blakhs?\b|\blpa\b)"
+    r"|₹|(?:^|[_\W])IN(?:[_\W]|$)"
+)
+YEAR_PATTERN = re.compile(r"(?<!\d)(20[0-9]{2})(?!\d)")
+
+def _first_pages_text(path, pages=2):
+    try:
+        reader = pypdf.PdfReader(path)
+        return "\n".join((page.extract_text() or "") for page in reader.pages[:pages])
+    except Exception as e:
+        print(f"Could not read {path} for tagging: {e}")
+        return ""
+
+def detect_region(text):
+    """Returns "india" if text names India, an Indian city or Indian pay units, else "global"."""
+    return "india" if INDIA_PATTERN.search(text or "") else "global"
+
+def classify_document(path, rel_path):
+    """
+    Tags a PDF with its collection (doc_type), region and publication year, from its file name
+    first and its first pages second. The source is its docs-relative path.
+    """
+    name = os.path.splitext(os.path.basename(rel_path))[0]
+    text = _first_pages_text(path)
+
+    doc_type = next((kind for kind, pattern in DOC_TYPE_PATTERNS if pattern.search(name)), None)
+    if doc_type is None:
+        doc_type = next((kind for kind, pattern in DOC_TYPE_PATTERNS if pattern.search(text[:2000])), DEFAULT_DOC_TYPE)
+
+    region = detect_region(name + "\n" + text[:4000])
+
+    this_year = date.today().year
+    years = [int(y) for y in YEAR_PATTERN.findall(name) if int(y) <= this_year]
+    years = years or [int(y) for y in YEAR_PATTERN.findall(text[:4000]) if int(y) <= this_year]
+    return {"source": rel_path, "doc_type": doc_type, "region": region, "year": max(years) if years else None}
+
+def tag_documents(docs_path, files, cache_path):
+    """
+    Returns {relative_path: metadata} for the given {relative_path: sha256} files. Tags are cached
+    in cache_path by content hash, so only new or changed PDFs are opened.
+    """
+    cached = {}
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == METADATA_VERSION:
+                cached = state["files"]
+        except (OSError, json.JSONDecodeError, KeyError) as e:
+            print(f"Ignoring unreadable document tags at {cache_path}: {e}")
+
+    tags = {}
+    for rel, sha in files.items():
+        entry = cached.get(rel)
+        if entry and entry["sha256"] == sha:
+            tags[rel] = entry["metadata"]
+        else:
+            tags[rel] = classify_document(os.path.join(docs_path, rel), rel)
+
+    if tags != {rel: entry["metadata"] for rel, entry in cached.items()}:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": METADATA_VERSION,
+                "files": {rel: {"sha256": files[rel], "metadata": tags[rel]} for rel in files},
+            }, f, indent=2)
+        os.replace(tmp_path, cache_path)
+    return tags
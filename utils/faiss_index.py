@@ -0,0 +1,175 @@
+import json
+import time
+import argparse
+import numpy as np
+import faiss
+from config.config import (
+    FAISS_INDEX_TYPE, FAISS_NLIST, FAISS_PQ_M, FAISS_PQ_NBITS, FAISS_HNSW_M,
+    FAISS_TRAIN_SAMPLE, FAISS_NPROBE, FAISS_EF_SEARCH
+)
+
+INDEX_TYPES = ("flat", "ivf", "ivfpq", "hnsw")
+
+def index_build_settings(kind=FAISS_INDEX_TYPE):
+    """Build-time parameters of an index type; a change in these requires rebuilding the index."""
+    settings = {"index_type": kind}
+    if kind in ("ivf", "ivfpq"):
+        settings["nlist"] = FAISS_NLIST
+    if kind == "ivfpq":
+        settings.update({"pq_m": FAISS_PQ_M, "pq_nbits": FAISS_PQ_NBITS})
+    if kind == "hnsw":
+        settings["hnsw_m"] = FAISS_HNSW_M
+    return settings
+
+def build_index(kind, training_vectors, nlist=FAISS_NLIST, pq_m=FAISS_PQ_M, pq_nbits=FAISS_PQ_NBITS, hnsw_m=FAISS_HNSW_M):
+    """
+    Creates an empty L2 index of the given type, trained on training_vectors when the type needs it.
+    IVF list counts are capped so every list gets enough training points; types that cannot be
+    trained on so few vectors fall back to an exact flat index.
+    """
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS index type '{kind}'. Expected one of {INDEX_TYPES}.")
+    training_vectors = np.ascontiguousarray(training_vectors, dtype=np.float32)
+    count, dimension = training_vectors.shape
+
+    if kind == "hnsw":
+        return faiss.IndexHNSWFlat(dimension, hnsw_m)
+    if kind == "flat":
+        return faiss.IndexFlatL2(dimension)
+
+    nlist = max(1, min(nlist, count // 39))
+    if kind == "ivfpq" and (dimension % pq_m or count < 2 ** pq_nbits):
+        print(f"Cannot train IVF-PQ (m={pq_m}, nbits={pq_nbits}) on {count} vectors of dimension {dimension}; using a flat index.")
+        return faiss.IndexFlatL2(dimension)
+
+    quantizer = faiss.IndexFlatL2(dimension)
+    if kind == "ivf":
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
+    else:
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, pq_nbits)
+    index.train(training_vectors)
+    return index
+
+def index_kind(index):
+    """Returns which of INDEX_TYPES an index actually is, e.g. "flat" for an IVF-PQ request that fell back."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+def apply_search_params(index, nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH):
+    """Sets the search-time accuracy/latency knobs on IVF (nprobe) and HNSW (efSearch) indexes."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = nprobe
+    hnsw_index = faiss.downcast_index(index)
+    if isinstance(hnsw_index, faiss.IndexHNSW):
+        hnsw_index.hnsw.efSearch = ef_search
+    return index
+
+def supports_removal(index):
+    """
+    LangChain's FAISS.delete assumes remove_ids renumbers the remaining vectors, which only flat
+    indexes do (IVF keeps the old ids and HNSW cannot delete), so other types are rebuilt instead.
+    """
+    return isinstance(faiss.downcast_index(index), faiss.IndexFlat)
+
+def get_vectors(index):
+    """Reconstructs every stored vector (exactly for flat, IVF-flat and HNSW; approximately for PQ)."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+def convert_index(index, kind=FAISS_INDEX_TYPE, train_sample=FAISS_TRAIN_SAMPLE, seed=0, **build_kwargs):
+    """
+    Returns a new index of the given type holding the same vectors in the same order, so a
+    LangChain FAISS store's docstore mapping stays valid when its index is swapped.
+    """
+    vectors = get_vectors(index)
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), size=min(len(vectors), train_sample), replace=False)]
+    converted = build_index(kind, sample, **build_kwargs)
+    converted.add(vectors)
+    return apply_search_params(converted)
+
+def _search_latencies(index, queries, k):
+    latencies = []
+    results = np.empty((len(queries), k), dtype=np.int64)
+    for row, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - start)
+        results[row] = ids[0]
+    return results, np.asarray(latencies)
+
+def recall_report(vectors, queries, k=4, configs=None):
+    """
+    Builds each candidate index over the same vectors and reports recall@k against the exact
+    flat baseline, per-query latency and serialized size, so settings can be chosen per corpus.
+    Rows are labelled with the type actually built ("kind") next to the one asked for ("requested_kind").
+    configs is a list of dicts: {"kind": ..., "nprobe": ..., "ef_search": ..., plus build kwargs}.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    if configs is None:
+        configs = [{"kind": "ivf", "nprobe": n} for n in (1, 4, 16, 64)]
+        configs += [{"kind": "hnsw", "ef_search": ef} for ef in (16, 64, 256)]
+        configs += [{"kind": "ivfpq", "nprobe": n} for n in (4, 16, 64)]
+
+    baseline = faiss.IndexFlatL2(vectors.shape[1])
+    baseline.add(vectors)
+    truth, flat_latencies = _search_latencies(baseline, queries, k)
+    report = [{
+        "kind": "flat", "recall_at_k": 1.0, "build_seconds": 0.0,
+        "p50_ms": float(np.percentile(flat_latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(flat_latencies, 99) * 1000),
+        "bytes": int(faiss.serialize_index(baseline).size),
+    }]
+
+    for config in configs:
+        config = dict(config)
+        requested_kind = config.pop("kind")
+        nprobe = config.pop("nprobe", FAISS_NPROBE)
+        ef_search = config.pop("ef_search", FAISS_EF_SEARCH)
+        start = time.perf_counter()
+        index = build_index(requested_kind, vectors[:FAISS_TRAIN_SAMPLE], **config)
+        kind = index_kind(index)
+        index.add(vectors)
+        build_seconds = time.perf_counter() - start
+        apply_search_params(index, nprobe=nprobe, ef_search=ef_search)
+
+        found, latencies = _search_latencies(index, queries, k)
+        hits = sum(len(set(found[row]) & set(truth[row])) for row in range(len(queries)))
+        report.append({
+            "kind": kind, "requested_kind": requested_kind,
+            "nprobe": nprobe if kind in ("ivf", "ivfpq") else None, "ef_search": ef_search if kind == "hnsw" else None,
+            **config,
+            "recall_at_k": hits / (len(queries) * k),
+            "build_seconds": build_seconds,
+            "p50_ms": float(np.percentile(latencies, 50) * 1000),
+            "p99_ms": float(np.percentile(latencies, 99) * 1000),
+            "bytes": int(faiss.serialize_index(index).size),
+        })
+    return report
+
+if __name__ == "__main__":
+    from models.embeddings import get_embedding_model
+    from utils.rag_handler import setup_vector_store
+
+    parser = argparse.ArgumentParser(description="Report recall vs latency of approximate FAISS indexes on the knowledge base.")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200, help="Stored chunks reused as queries.")
+    args = parser.parse_args()
+
+    vectorstore = setup_vector_store(get_embedding_model())
+    if vectorstore is None:
+        raise SystemExit("No documents found to build the knowledge base from.")
+    stored_vectors = get_vectors(vectorstore.index)
+    rng = np.random.default_rng(0)
+    query_vectors = stored_vectors[rng.choice(len(stored_vectors), size=min(args.queries, len(stored_vectors)), replace=False)]
+    print(json.dumps(recall_report(stored_vectors, query_vectors, k=args.k), indent=2))
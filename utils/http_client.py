@@ -0,0 +1,67 @@
+import threading
+import certifi
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils.cache import ResultCache, make_cache_key
+from utils.metrics import timed
+from config.config import (
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR,
+    HTTP_POOL_SIZE, HTTP_CACHE_TTL_SECONDS, HTTP_CACHE_SIZE
+)
+
+_session = None
+_session_lock = threading.Lock()
+_response_cache = ResultCache("http_responses", max_entries=HTTP_CACHE_SIZE, ttl_seconds=HTTP_CACHE_TTL_SECONDS)
+
+def get_session():
+    """
+    Returns the process-wide requests Session shared by every external API call.
+    Connections are kept alive and pooled, the certifi CA bundle is loaded once,
+    and idempotent failures (connection errors, 429 and 5xx) are retried with backoff.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=HTTP_MAX_RETRIES,
+                    backoff_factor=HTTP_BACKOFF_FACTOR,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset({"GET", "POST"}),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+                session = requests.Session()
+                session.verify = certifi.where()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def normalize_query(*parts):
+    """Lower-cases and collapses whitespace so equivalent searches share a cache entry."""
+    return tuple(" ".join(str(part).lower().split()) for part in parts)
+
+def request_json(method, url, cache_key=None, stage="http", **kwargs):
+    """
+    Sends a request through the shared session and returns the decoded JSON body.
+    When cache_key is given, successful responses are reused until HTTP_CACHE_TTL_SECONDS expires.
+    Raises requests exceptions (including HTTPError for non-2xx responses) like requests itself.
+    Latency and errors are recorded under the given metrics stage.
+    """
+    key = make_cache_key(method, url, cache_key) if cache_key is not None else None
+    if key is not None:
+        cached = _response_cache.get(key)
+        if cached is not None:
+            return cached
+
+    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    with timed(stage):
+        response = get_session().request(method, url, **kwargs)
+        response.raise_for_status()
+        data = response.json()
+
+    if key is not None:
+        _response_cache.set(key, data)
+    return data
@@ -0,0 +1,263 @@
+import time
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from typing import Any
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumps
+from utils.cache import make_cache_key
+from utils.context import estimate_tokens
+from utils.metrics import observe, increment
+from config.config import (
+    LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, LLM_INTERACTIVE_RESERVE, LLM_COMPLETION_TOKEN_ESTIMATE,
+    LLM_MAX_RETRIES, LLM_BACKOFF_SECONDS, LLM_MAX_BACKOFF_SECONDS, LLM_RATE_SHARE
+)
+
+# Lower values are served first.
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+def _is_rate_limit_error(error):
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+def _retry_after_seconds(error):
+    """Reads the Retry-After header of a 429 response, if the provider sent one."""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Refills at rate_per_minute up to one minute's worth; not thread-safe on its own."""
+
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now, scale=1.0):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate * scale)
+        self.updated = now
+
+    def wait_time(self, amount, scale=1.0):
+        return max(0.0, (amount - self.level) / (self.rate * scale))
+
+class LLMGateway:
+    """
+    Process-wide gate in front of the LLM provider:
+    - single-flight: identical prompts already in flight share one call;
+    - request and token buckets sized to the provider quota;
+    - interactive callers are served before batch callers, and batch callers leave a share
+      (LLM_INTERACTIVE_RESERVE) of each bucket free for interactive traffic;
+    - on a 429 every caller pauses for Retry-After (or an exponential backoff) and the
+      refill rate is halved, then recovers gradually as calls succeed.
+    All of this is per process: each process gets rate_share of the quota (LLM_RATE_SHARE), and
+    priorities only order calls within it.
+    """
+
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE, tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+                 interactive_reserve=LLM_INTERACTIVE_RESERVE, max_retries=LLM_MAX_RETRIES, rate_share=LLM_RATE_SHARE):
+        if not 0 < rate_share <= 1:
+            raise ValueError(f"rate_share must be in (0, 1], got {rate_share}")
+        self.requests = TokenBucket(requests_per_minute * rate_share)
+        self.tokens = TokenBucket(tokens_per_minute * rate_share)
+        self.interactive_reserve = interactive_reserve
+        self.max_retries = max_retries
+        self._condition = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._rate_scale = 1.0
+        self._blocked_until = 0.0
+        self._consecutive_limits = 0
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    def _wait_time(self, tokens, priority, now):
+        for bucket in (self.requests, self.tokens):
+            bucket.refill(now, self._rate_scale)
+        reserve = 0.0 if priority == "interactive" else self.interactive_reserve
+        # Capped at the bucket size: a batch call bigger than the unreserved share waits for a full bucket, not forever.
+        request_need = min(1 + reserve * self.requests.capacity, self.requests.capacity)
+        token_need = min(tokens + reserve * self.tokens.capacity, self.tokens.capacity)
+        return max(
+            self._blocked_until - now,
+            self.requests.wait_time(request_need, self._rate_scale),
+            self.tokens.wait_time(token_need, self._rate_scale),
+        )
+
+    def acquire(self, tokens, priority="interactive"):
+        """Blocks until this caller is first in line and the buckets can cover `tokens`, then takes them."""
+        ticket = (PRIORITIES[priority], next(self._sequence))
+        start = time.perf_counter()
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        wait = self._wait_time(tokens, priority, time.monotonic())
+                        if wait <= 0:
+                            self.requests.level -= 1
+                            self.tokens.level -= tokens
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+        observe(f"llm.gateway.queue.{priority}", time.perf_counter() - start)
+
+    def settle(self, estimated_tokens, usage):
+        """Charges (or refunds) the difference between the estimated and the reported token usage."""
+        if not usage:
+            return
+        actual = usage.get("total_tokens") or (
+            (usage.get("prompt_tokens") or usage.get("input_tokens") or 0)
+            + (usage.get("completion_tokens") or usage.get("output_tokens") or 0)
+        )
+        if actual:
+            with self._condition:
+                self.tokens.level -= actual - estimated_tokens
+
+    def record_success(self):
+        with self._condition:
+            self._consecutive_limits = 0
+            self._rate_scale = min(1.0, self._rate_scale + 0.05)
+
+    def record_rate_limit(self, error):
+        """Pauses every caller and halves the refill rate after a 429."""
+        increment("rate_limited", "llm.gateway")
+        with self._condition:
+            self._consecutive_limits += 1
+            delay = _retry_after_seconds(error) or min(
+                LLM_MAX_BACKOFF_SECONDS, LLM_BACKOFF_SECONDS * 2 ** (self._consecutive_limits - 1)
+            )
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            self._rate_scale = max(0.1, self._rate_scale / 2)
+            self._condition.notify_all()
+        print(f"LLM rate limit hit; pausing requests for {delay:.1f}s.")
+
+    def call(self, fn, estimated_tokens, priority="interactive"):
+        """Runs fn() under the rate limits, retrying on 429 up to max_retries times."""
+        for attempt in range(self.max_retries + 1):
+            self.acquire(estimated_tokens, priority)
+            try:
+                result = fn()
+            except Exception as e:
+                if not _is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                self.record_rate_limit(e)
+                continue
+            self.record_success()
+            return result
+
+    def single_flight(self, key, fn):
+        """Runs fn() once for concurrent callers with the same key; the others wait for its result."""
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            increment("coalesced", "llm.gateway")
+            return future.result()
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+        return future.result()
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_gateway():
+    """Returns the gateway shared by every LLM in this process."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
+
+def configure_gateway(**kwargs):
+    """Replaces this process's gateway with one built from kwargs (e.g. rate_share); call before the first LLM call."""
+    global _gateway
+    with _gateway_lock:
+        _gateway = LLMGateway(**kwargs)
+        return _gateway
+
+def _estimate_request_tokens(messages):
+    return estimate_tokens("".join(str(message.content) for message in messages)) + LLM_COMPLETION_TOKEN_ESTIMATE
+
+class GatewayChatModel(BaseChatModel):
+    """
+    Wraps a chat model so every call goes through the process-wide LLMGateway.
+    The wrapped model should not retry 429s itself (ChatGroq: max_retries=0).
+    """
+
+    llm: BaseChatModel
+    priority: str = "interactive"
+
+    @property
+    def _llm_type(self):
+        return f"gateway-{self.llm._llm_type}"
+
+    @property
+    def model_name(self):
+        return getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None) or type(self.llm).__name__
+
+    def with_priority(self, priority):
+        """Returns a copy that queues its calls at the given priority ("interactive" or "batch")."""
+        return self.model_copy(update={"priority": priority})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        gateway = get_gateway()
+        estimated_tokens = _estimate_request_tokens(messages)
+        led = False
+
+        def generate():
+            nonlocal led
+            led = True
+            result = gateway.call(
+                lambda: self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+                estimated_tokens, self.priority,
+            )
+            gateway.settle(estimated_tokens, (result.llm_output or {}).get("token_usage"))
+            return result
+
+        key = make_cache_key(self.llm._get_llm_string(stop=stop, **kwargs), dumps(messages))
+        result = gateway.single_flight(key, generate)
+        if not led and run_manager:
+            # Only the leader's callbacks saw tokens stream in; replay the answer to this caller's.
+            for generation in result.generations:
+                if generation.text:
+                    run_manager.on_llm_new_token(generation.text)
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        gateway = get_gateway()
+        estimated_tokens = _estimate_request_tokens(messages)
+        for attempt in range(gateway.max_retries + 1):
+            gateway.acquire(estimated_tokens, self.priority)
+            started = False
+            try:
+                for chunk in self.llm._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                # A stream can only be retried before its first chunk has been shown.
+                if started or not _is_rate_limit_error(e) or attempt == gateway.max_retries:
+                    raise
+                gateway.record_rate_limit(e)
+                continue
+            gateway.record_success()
+            return
+
+def with_gateway(llm, priority="interactive", callbacks=None):
+    """Wraps a chat model in GatewayChatModel; callbacks (e.g. metrics) go on the wrapper."""
+    return GatewayChatModel(llm=llm, priority=priority, callbacks=callbacks)
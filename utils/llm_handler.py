@@ -1,125 +1,280 @@
 import os
+import re
+import json
+from datetime import date
 from langchain_groq import ChatGroq
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.cache import ResultCache, make_cache_key
+from utils.metrics import MetricsCallbackHandler, increment
+from utils.context import estimate_tokens, truncate_to_tokens, CHARS_PER_TOKEN
+from utils.resume_extractor import extract_resume_fields
+from utils.llm_gateway import with_gateway
+from config.config import RESULT_CACHE_SIZE, RESULT_CACHE_DIR, ANALYSIS_MAX_CONCURRENCY, RESUME_TOKEN_BUDGET
 
-def get_llm():
+# Bump whenever the analysis prompt changes so stale cached analyses are not reused.
+ANALYSIS_PROMPT_VERSION = "2"
+OFFER_PROMPT_VERSION = "2"
+# Resume and offer text past this is cut by budget_resume_text, so PDF extraction can stop there.
+DOCUMENT_TEXT_MAX_CHARS = RESUME_TOKEN_BUDGET * CHARS_PER_TOKEN
+SUGGESTIONS_ERROR_MESSAGE = "Error: Could not get resume suggestions due to an API failure."
+
+# JSON shape of each resume field the LLM extracts, in output order. Email, phone, links and
+# total_experience_years are extracted locally by utils.resume_extractor instead.
+ANALYSIS_FIELD_SCHEMAS = {
+    "personal_details": '{ "name": "string", "location": "string" }',
+    "summary": '"string"',
+    "work_experience": '[{ "job_title": "string", "company": "string", "location": "string", "start_date": "string", "end_date": "string", "responsibilities": ["string"] }]',
+    "education": '[{ "institution": "string", "degree": "string", "location": "string", "start_date": "string", "end_date": "string" }]',
+    "projects": '[{ "name": "string", "technologies": "string", "description": "string" }]',
+    "technical_skills": '{ "languages": ["string"], "libraries_and_technologies": ["string"] }',
+    "certifications": '["string"]',
+}
+
+# Offer letter fields. Amounts are kept as written (with their period) and parsed by utils.offers.
+OFFER_FIELD_SCHEMAS = {
+    "company": '"string"',
+    "role": '"string"',
+    "location": '"string"',
+    "currency": '"string (ISO code, e.g. INR, USD)"',
+    "base_salary": '"string (fixed pay as written, with its period, e.g. 18,00,000 per annum)"',
+    "bonus": '"string (target or variable bonus as written, e.g. 10% of base)"',
+    "equity": '"string (stock or RSU value as written, per year if stated)"',
+    "joining_bonus": '"string"',
+    "total_ctc": '"string (total annual cost to company as written)"',
+    "other_benefits": '["string"]',
+}
+
+# Style line of the parsing prompt, per document type and response mode.
+STYLE_INSTRUCTIONS = {
+    "resume": {
+        "Concise": "Be concise and brief in all text fields (e.g., summary, responsibilities).",
+        "Detailed": "Provide detailed and comprehensive information in all text fields (e.g., summary, responsibilities).",
+    },
+    "offer letter": {
+        "Concise": "Copy every amount exactly as written, with its period, and keep each of other_benefits to a short phrase.",
+        "Detailed": "Copy every amount exactly as written, with its period, and list every benefit in other_benefits with its stated value or conditions.",
+    },
+}
+
+_analysis_cache = ResultCache("resume_analysis", max_entries=RESULT_CACHE_SIZE, disk_dir=RESULT_CACHE_DIR)
+
+def get_model_name(llm):
+    """Returns the model identifier of an LLM instance, used as part of cache keys."""
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+def get_llm(priority="interactive"):
     """
-    Returns an instance of the Groq LLM with the Llama3 model.
+    Returns an instance of the Groq LLM with the Llama3 model, behind the shared LLM gateway.
+    Use priority="batch" for bulk jobs so they yield to interactive users.
     """
     groq_api_key = os.getenv("GROQ_API_KEY")
     if not groq_api_key:
         raise ValueError("GROQ_API_KEY not found in .env file. Please set it.")
         
-    return ChatGroq(
+    llm = ChatGroq(
         model_name="llama3-70b-8192",
         groq_api_key=groq_api_key,
-        temperature=0.2
+        temperature=0.2,
+        max_retries=0 # The gateway retries rate-limited calls.
     )
+    return with_gateway(llm, priority, callbacks=[MetricsCallbackHandler("llm.groq")])
 
-def analyze_document_text(text, llm, response_mode="Detailed"):
-    """
-    Analyzes resume text to extract structured data, with error handling.
-    """
-    try:
-        if response_mode == "Concise":
-            style_instruction = "Be concise and brief in all text fields (e.g., summary, responsibilities)."
-        else:
-            style_instruction = "Provide detailed and comprehensive information in all text fields (e.g., summary, responsibilities)."
-
-        prompt = f"""
-        You are an expert HR and technical recruiter. Your task is to parse the following resume text. {style_instruction}
-        A crucial part of your task is to calculate the "total_experience_years" by looking at the dates in the work experience section. For "Present" dates, assume the current date is August 2025.
+def budget_resume_text(text, max_tokens=RESUME_TOKEN_BUDGET, stage="resume.context"):
+    """Trims resume text to the prompt budget and records the tokens it will use."""
+    text = truncate_to_tokens(text, max_tokens)
+    increment("prompt_tokens", stage, estimate_tokens(text))
+    return text
+
+def _build_analysis_prompt(text, fields, response_mode="Detailed", schemas=ANALYSIS_FIELD_SCHEMAS, document_type="resume"):
+    """Builds the parsing prompt for the given subset of a field schema."""
+    styles = STYLE_INSTRUCTIONS[document_type]
+    style_instruction = styles["Concise"] if response_mode == "Concise" else styles["Detailed"]
+    schema = ",\n".join(f'          "{field}": {schemas[field]}' for field in fields)
+
+    return f"""
+        You are an expert HR and technical recruiter. Your task is to parse the following {document_type} text. {style_instruction}
         You MUST return the output as a clean JSON object. Do not add any text or markdown formatting before or after the JSON.
 
         Use this exact JSON format for your response:
         {{
-          "personal_details": {{
-            "name": "string",
-            "email": "string",
-            "phone": "string",
-            "location": "string",
-            "links": [
-              {{ "site": "GitHub", "url": "string" }},
-              {{ "site": "LinkedIn", "url": "string" }}
-            ]
-          }},
-          "summary": "string",
-          "total_experience_years": "string (e.g., '2.5 years', '5 years')",
-          "work_experience": [
-            {{
-              "job_title": "string",
-              "company": "string",
-              "location": "string",
-              "start_date": "string",
-              "end_date": "string",
-              "responsibilities": [
-                "string",
-                "string"
-              ]
-            }}
-          ],
-          "education": [
-            {{
-              "institution": "string",
-              "degree": "string",
-              "location": "string",
-              "start_date": "string",
-              "end_date": "string"
-            }}
-          ],
-          "projects": [
-            {{
-              "name": "string",
-              "technologies": "string",
-              "description": "string"
-            }}
-          ],
-          "technical_skills": {{
-            "languages": ["string"],
-            "libraries_and_technologies": ["string"]
-          }},
-          "certifications": ["string"]
+{schema}
         }}
 
-        Resume Text to Parse:
+        {document_type.title()} Text to Parse:
         ---
         {text}
         ---
         """
-        response = llm.invoke(prompt)
-        return response.content
+
+def _parse_analysis_fields(content, fields, schemas=ANALYSIS_FIELD_SCHEMAS):
+    """
+    Decodes each expected top-level key of an LLM response on its own, so one malformed or
+    truncated value does not discard the others. Returns (parsed, failed_fields).
+    """
+    decoder = json.JSONDecoder()
+    parsed = {}
+    for field in fields:
+        match = re.search(rf'"{field}"\s*:\s*', content)
+        if not match:
+            continue
+        try:
+            value, _ = decoder.raw_decode(content, match.end())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, type(json.loads(schemas[field]))):
+            parsed[field] = value
+    return parsed, [field for field in fields if field not in parsed]
+
+def _request_fields(text, llm, response_mode="Detailed", schemas=ANALYSIS_FIELD_SCHEMAS, document_type="resume"):
+    """
+    Asks the LLM for every field in schemas, then once more for only the fields whose JSON
+    could not be decoded. Returns the decoded fields (possibly incomplete).
+    """
+    fields = list(schemas)
+    response = llm.invoke(_build_analysis_prompt(text, fields, response_mode, schemas, document_type))
+    parsed, failed = _parse_analysis_fields(response.content, fields, schemas)
+    if failed:
+        print(f"Re-requesting {document_type} fields that could not be parsed: {', '.join(failed)}")
+        increment("retries", "llm.analysis")
+        retry = llm.invoke(_build_analysis_prompt(text, failed, response_mode, schemas, document_type))
+        retried, failed = _parse_analysis_fields(retry.content, failed, schemas)
+        parsed.update(retried)
+    return parsed
+
+def _empty_value(schemas, field):
+    return type(json.loads(schemas[field]))()
+
+def analyze_document_text(text, llm, response_mode="Detailed"):
+    """
+    Analyzes resume text to extract structured data, with error handling.
+    Contact details, links and total experience are extracted locally; the LLM fills in the rest,
+    and only fields whose JSON could not be decoded are requested again.
+    Results are cached on (text, response_mode, model, prompt version, current month).
+    """
+    text = budget_resume_text(text)
+    today = date.today()
+    cache_key = make_cache_key(text, response_mode, get_model_name(llm), ANALYSIS_PROMPT_VERSION, today.strftime("%Y-%m"))
+    cached_result = _analysis_cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+
+    try:
+        local_fields = extract_resume_fields(text, today)
+        parsed = _request_fields(text, llm, response_mode)
+        if not parsed:
+            print("--- ERROR in analyze_document_text ---")
+            print("The LLM response could not be parsed as JSON.")
+            return None
+
+        personal_details = parsed.get("personal_details") or {}
+        analysis = {
+            "personal_details": {
+                "name": personal_details.get("name", ""),
+                "email": local_fields["email"],
+                "phone": local_fields["phone"],
+                "location": personal_details.get("location", ""),
+                "links": local_fields["links"],
+            },
+            "summary": parsed.get("summary", ""),
+            "total_experience_years": local_fields["total_experience_years"] or "Not specified",
+        }
+        for field in list(ANALYSIS_FIELD_SCHEMAS)[2:]:
+            analysis[field] = parsed.get(field, _empty_value(ANALYSIS_FIELD_SCHEMAS, field))
+
+        result = json.dumps(analysis, ensure_ascii=False)
+        _analysis_cache.set(cache_key, result)
+        return result
     except Exception as e:
         print(f"--- ERROR in analyze_document_text ---")
         print(f"LLM call failed. Error: {e}")
         traceback.print_exc()
         return None # Return None on failure
 
+def analyze_offer_text(text, llm, response_mode="Concise"):
+    """
+    Extracts company, role, location and compensation components from an offer letter as a JSON string.
+    Results are cached on (text, response_mode, model, prompt version).
+    """
+    cache_key = make_cache_key("offer", text, response_mode, get_model_name(llm), OFFER_PROMPT_VERSION)
+    cached_result = _analysis_cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+
+    try:
+        parsed = _request_fields(budget_resume_text(text, stage="offer.context"), llm, response_mode, OFFER_FIELD_SCHEMAS, "offer letter")
+        if not parsed:
+            print("--- ERROR in analyze_offer_text ---")
+            print("The LLM response could not be parsed as JSON.")
+            return None
+        offer = {field: parsed.get(field, _empty_value(OFFER_FIELD_SCHEMAS, field)) for field in OFFER_FIELD_SCHEMAS}
+        result = json.dumps(offer, ensure_ascii=False)
+        _analysis_cache.set(cache_key, result)
+        return result
+    except Exception as e:
+        print("--- ERROR in analyze_offer_text ---")
+        print(f"LLM call failed. Error: {e}")
+        traceback.print_exc()
+        return None
+
+def analyze_documents_concurrently(documents, llm, response_mode="Detailed", max_concurrency=ANALYSIS_MAX_CONCURRENCY, analyze_fn=analyze_document_text):
+    """
+    Analyzes several (key, text) pairs with at most max_concurrency LLM calls in flight.
+    Yields (key, result) pairs in completion order, so callers can render each result as soon as it is ready.
+    analyze_fn is analyze_document_text for resumes or analyze_offer_text for offer letters.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        futures = {
+            pool.submit(analyze_fn, text, llm, response_mode=response_mode): key
+            for key, text in documents
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def _build_suggestions_prompt(resume_text, response_mode="Detailed"):
+    """Builds the resume improvement prompt for the selected response mode."""
+    if response_mode == "Concise":
+        style_instruction = "Provide a very brief, summarized list of the top 3 most important improvement points."
+    else:
+        style_instruction = """
+        Provide a detailed, in-depth analysis. Give specific, actionable suggestions for each section of the resume (Summary, Work Experience, Projects, Skills). 
+        Use bullet points for clarity and offer examples of improved phrasing where appropriate. Maintain a constructive and encouraging tone.
+        """
+    resume_text = budget_resume_text(resume_text)
+
+    return f"""
+    You are an expert career coach and senior technical recruiter in India. Your task is to review the following resume text and provide actionable suggestions for improvement.
+    {style_instruction}
+
+    Resume Text to Analyze:
+    ---
+    {resume_text}
+    ---
+    """
+
 def get_resume_improvement_suggestions(resume_text, llm, response_mode="Detailed"):
     """
     Analyzes resume text for improvements with error handling.
     """
     try:
-        if response_mode == "Concise":
-            style_instruction = "Provide a very brief, summarized list of the top 3 most important improvement points."
-        else:
-            style_instruction = """
-            Provide a detailed, in-depth analysis. Give specific, actionable suggestions for each section of the resume (Summary, Work Experience, Projects, Skills). 
-            Use bullet points for clarity and offer examples of improved phrasing where appropriate. Maintain a constructive and encouraging tone.
-            """
-
-        prompt = f"""
-        You are an expert career coach and senior technical recruiter in India. Your task is to review the following resume text and provide actionable suggestions for improvement.
-        {style_instruction}
-
-        Resume Text to Analyze:
-        ---
-        {resume_text}
-        ---
-        """
-        response = llm.invoke(prompt)
+        response = llm.invoke(_build_suggestions_prompt(resume_text, response_mode))
         return response.content
     except Exception as e:
         print(f"--- ERROR in get_resume_improvement_suggestions ---")
         print(f"LLM call failed. Error: {e}")
         traceback.print_exc()
-        return "Error: Could not get resume suggestions due to an API failure."
+        return SUGGESTIONS_ERROR_MESSAGE
+
+def stream_resume_improvement_suggestions(resume_text, llm, response_mode="Detailed"):
+    """
+    Streaming variant of get_resume_improvement_suggestions; yields text chunks as they arrive.
+    """
+    try:
+        for chunk in llm.stream(_build_suggestions_prompt(resume_text, response_mode)):
+            if chunk.content:
+                yield chunk.content
+    except Exception as e:
+        print(f"--- ERROR in stream_resume_improvement_suggestions ---")
+        print(f"LLM call failed. Error: {e}")
+        traceback.print_exc()
+        yield SUGGESTIONS_ERROR_MESSAGE
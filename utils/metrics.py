@@ -0,0 +1,274 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Latency histogram bucket upper bounds, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+
+def _histogram(stage):
+    if stage not in _histograms:
+        _histograms[stage] = {"buckets": [0] * (len(LATENCY_BUCKETS) + 1), "sum": 0.0, "count": 0}
+    return _histograms[stage]
+
+def observe(stage, seconds):
+    """Records one latency sample for a stage."""
+    with _lock:
+        histogram = _histogram(stage)
+        position = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        histogram["buckets"][position] += 1
+        histogram["sum"] += seconds
+        histogram["count"] += 1
+
+def increment(name, stage, amount=1):
+    """Adds to a named counter (e.g. 'calls', 'errors', 'prompt_tokens', 'cache_hits') for a stage."""
+    with _lock:
+        key = (name, stage)
+        _counters[key] = _counters.get(key, 0) + amount
+
+@contextmanager
+def timed(stage):
+    """Context manager that records call count, latency and errors for a stage."""
+    start = time.perf_counter()
+    increment("calls", stage)
+    try:
+        yield
+    except Exception:
+        increment("errors", stage)
+        raise
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+@contextmanager
+def collect_timing(timings, stage):
+    """
+    Like timed, but adds the latency to the timings dict instead of the registry. For code running
+    in worker processes, whose registry the parent never sees; record the dict there with record_timings.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+def record_timings(timings):
+    """Records stage latencies measured elsewhere (e.g. by collect_timing in a worker) as one call each."""
+    for stage, seconds in timings.items():
+        increment("calls", stage)
+        observe(stage, seconds)
+
+def record_cache(stage, hit):
+    increment("cache_hits" if hit else "cache_misses", stage)
+
+def record_token_usage(stage, usage):
+    """Adds prompt/completion token counts from a provider usage dict to a stage's counters."""
+    if not usage:
+        return
+    prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens", 0)) or 0
+    completion_tokens = usage.get("completion_tokens", usage.get("output_tokens", 0)) or 0
+    increment("prompt_tokens", stage, prompt_tokens)
+    increment("completion_tokens", stage, completion_tokens)
+
+def _quantile(histogram, q):
+    """Estimates a quantile as the upper bound of the bucket that contains it."""
+    if not histogram["count"]:
+        return None
+    target = q * histogram["count"]
+    running = 0
+    for position, count in enumerate(histogram["buckets"]):
+        running += count
+        if running >= target:
+            return LATENCY_BUCKETS[position] if position < len(LATENCY_BUCKETS) else float("inf")
+    return float("inf")
+
+def snapshot():
+    """Returns every stage's counters and latency summary as a JSON-serialisable dict."""
+    with _lock:
+        stages = {}
+        for (name, stage), value in _counters.items():
+            stages.setdefault(stage, {})[name] = value
+        for stage, histogram in _histograms.items():
+            entry = stages.setdefault(stage, {})
+            entry["latency_seconds"] = {
+                "count": histogram["count"],
+                "mean": histogram["sum"] / histogram["count"] if histogram["count"] else None,
+                "p50": _quantile(histogram, 0.5),
+                "p95": _quantile(histogram, 0.95),
+                "p99": _quantile(histogram, 0.99),
+                "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], histogram["buckets"])),
+            }
+        for entry in stages.values():
+            lookups = entry.get("cache_hits", 0) + entry.get("cache_misses", 0)
+            if lookups:
+                entry["cache_hit_rate"] = entry.get("cache_hits", 0) / lookups
+        return {"generated_at": time.time(), "stages": stages}
+
+def summary_rows():
+    """Flattens the snapshot into one row per stage, for tabular display."""
+    rows = []
+    for stage, entry in sorted(snapshot()["stages"].items()):
+        latency = entry.get("latency_seconds", {})
+        rows.append({
+            "stage": stage,
+            "calls": entry.get("calls", 0),
+            "errors": entry.get("errors", 0),
+            "mean_s": latency.get("mean"),
+            "p50_s": latency.get("p50"),
+            "p95_s": latency.get("p95"),
+            "prompt_tokens": entry.get("prompt_tokens", 0),
+            "completion_tokens": entry.get("completion_tokens", 0),
+            "cache_hit_rate": entry.get("cache_hit_rate"),
+        })
+    return rows
+
+def to_json():
+    return json.dumps(snapshot(), indent=2)
+
+def to_prometheus():
+    """Renders all metrics in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        lines.append("# TYPE paygrade_stage_latency_seconds histogram")
+        for stage, histogram in sorted(_histograms.items()):
+            cumulative = 0
+            for bound, count in zip(list(LATENCY_BUCKETS) + ["+Inf"], histogram["buckets"]):
+                cumulative += count
+                lines.append(f'paygrade_stage_latency_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'paygrade_stage_latency_seconds_sum{{stage="{stage}"}} {histogram["sum"]}')
+            lines.append(f'paygrade_stage_latency_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+        for name in sorted({name for name, _ in _counters}):
+            lines.append(f"# TYPE paygrade_{name}_total counter")
+            for (counter_name, stage), value in sorted(_counters.items()):
+                if counter_name == name:
+                    lines.append(f'paygrade_{name}_total{{stage="{stage}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = to_prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = to_json(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+_server = None
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """
+    Serves /metrics (Prometheus text) and /metrics.json from a daemon thread, on localhost
+    unless another host is given.
+    Safe to call more than once; only the first call starts a server.
+    """
+    global _server
+    with _lock:
+        if _server is not None or not port:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+        except OSError as e:
+            print(f"Could not start metrics server on {host}:{port}: {e}")
+            return None
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback that records latency, call counts and token usage for every
+    LLM call, tool call and agent step it observes. Pass llm_stage=None to ignore LLM calls
+    that are already recorded by the model's own handler. An agent step is timed from the
+    previous step (or the start of the run) to the agent's next action or final answer.
+    """
+
+    def __init__(self, llm_stage="llm"):
+        self.llm_stage = llm_stage
+        self._started = {}
+        self._step_started = {}
+
+    def _start(self, run_id, stage):
+        self._started[run_id] = (stage, time.perf_counter())
+        increment("calls", stage)
+
+    def _finish(self, run_id, error=False):
+        stage, start = self._started.pop(run_id, (None, None))
+        if stage is None:
+            return None
+        observe(stage, time.perf_counter() - start)
+        if error:
+            increment("errors", stage)
+        return stage
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        if self.llm_stage:
+            self._start(run_id, self.llm_stage)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        if self.llm_stage:
+            self._start(run_id, self.llm_stage)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        stage = self._finish(run_id)
+        if stage is None:
+            return
+        usage = (response.llm_output or {}).get("token_usage")
+        if not usage and response.generations and response.generations[0]:
+            message = getattr(response.generations[0][0], "message", None)
+            usage = getattr(message, "usage_metadata", None)
+        record_token_usage(stage, usage)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=True)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, f"agent.tool.{(serialized or {}).get('name', 'unknown')}")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=True)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id is None:
+            self._step_started[run_id] = time.perf_counter()
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._step_started.pop(run_id, None)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._step_started.pop(run_id, None)
+
+    def _end_step(self, run_id):
+        start = self._step_started.get(run_id)
+        if start is not None:
+            now = time.perf_counter()
+            observe("agent.step", now - start)
+            self._step_started[run_id] = now
+
+    def on_agent_action(self, action, *, run_id, **kwargs):
+        increment("steps", "agent")
+        self._end_step(run_id)
+
+    def on_agent_finish(self, finish, *, run_id, **kwargs):
+        self._end_step(run_id)
@@ -0,0 +1,201 @@
+import os
+import re
+import io
+import numpy as np
+import pandas as pd
+from utils.salary_table import lookup_salary
+from config.config import OFFER_BASE_CURRENCY, CURRENCY_RATES_TO_INR
+
+# Flat, typed schema of one offer. Money columns are annual amounts in OFFER_BASE_CURRENCY.
+OFFER_COLUMNS = {
+    "file_name": "string", "company": "string", "role": "string", "location": "string",
+    "currency": "string", "fx_rate": "float64",
+    "base_annual": "float64", "bonus_annual": "float64", "equity_annual": "float64",
+    "joining_bonus": "float64", "ctc_annual": "float64", "benefits_count": "int64",
+}
+MARKET_COLUMNS = {
+    "market_min": "float64", "market_median": "float64", "market_max": "float64",
+    "market_percentile": "float64", "market_source": "string",
+    "market_location": "string", "market_location_found": "boolean",
+}
+DEFAULT_OFFER_WEIGHTS = {"ctc_annual": 0.5, "base_annual": 0.3, "bonus_annual": 0.1, "equity_annual": 0.1}
+
+# Checked in order, so "S$" is read as SGD before "$" is read as USD, and "CN¥" as CNY before "¥" as JPY.
+# Currencies without a configured rate are still detected, so they are not mistaken for the base currency.
+CURRENCY_MARKERS = [
+    ("SGD", r"s\$|\bsgd\b|singapore dollars?"), ("CAD", r"c\$|\bcad\b|canadian dollars?"),
+    ("AUD", r"a\$|\baud\b|australian dollars?"), ("HKD", r"hk\$|\bhkd\b|hong kong dollars?"),
+    ("NZD", r"nz\$|\bnzd\b|new zealand dollars?"), ("INR", r"₹|\brs(?![a-z])|\binr\b|\brupees?\b"),
+    ("USD", r"\$|\busd\b|\bdollars?\b"), ("EUR", r"€|\beur\b|\beuros?\b"), ("GBP", r"£|\bgbp\b|\bpounds?\b|sterling"),
+    ("AED", r"\baed\b|\bdirhams?\b"), ("CNY", r"cn¥|\bcny\b|\brmb\b|\byuan\b|renminbi"),
+    ("JPY", r"¥|\bjpy\b|\byen\b"), ("CHF", r"\bchf\b|swiss francs?"),
+]
+# What the LLM writes in the currency field when the letter does not state one.
+_UNSPECIFIED_CURRENCY = {"", "unknown", "not specified", "not mentioned", "not stated", "n/a", "na", "none", "null"}
+_AMOUNT_PATTERN = re.compile(
+    r"(\d[\d,]*(?:\.\d+)?)\s*(%|lpa|lakhs?|lacs?|l\b|cr\b|crores?|k\b|mn\b|million|m\b)?", re.IGNORECASE
+)
+_UNIT_MULTIPLIERS = {
+    "lpa": 100_000, "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lacs": 100_000, "l": 100_000,
+    "cr": 10_000_000, "crore": 10_000_000, "crores": 10_000_000,
+    "k": 1_000, "m": 1_000_000, "mn": 1_000_000, "million": 1_000_000,
+}
+_MONTHLY_PATTERN = re.compile(r"per\s+month|/\s*month|\bmonthly\b|\bp\.?\s?m\b", re.IGNORECASE)
+# Numbers followed by these count shares or time, not money ("1000 RSUs", "2 years cliff", "4-year vesting").
+_NON_MONEY_PATTERN = re.compile(
+    r"\s*-?\s*(?:shares?|rsus?|units?|(?:stock\s+)?options?|esops?|years?|yrs?|months?|weeks?|days?|hours?)\b", re.IGNORECASE
+)
+
+def detect_currency(text, default=""):
+    """Returns the ISO code of the first currency marker found in text, or default."""
+    for code, pattern in CURRENCY_MARKERS:
+        if re.search(pattern, text or "", re.IGNORECASE):
+            return code
+    return default
+
+def parse_money(text, base_amount=np.nan):
+    """
+    Parses an amount as written in an offer ('18,00,000 per annum', '18 LPA', '$12k/month',
+    '10% of base') into an annual number in the text's own currency; NaN if there is none.
+    Percentages are taken of base_amount. Share counts and durations are skipped, so
+    '1000 RSUs worth $40,000' reads as 40,000 and '2 years cliff' as NaN.
+    """
+    text = text or ""
+    match = next(
+        (m for m in _AMOUNT_PATTERN.finditer(text) if not _NON_MONEY_PATTERN.match(text, m.end())), None
+    )
+    if not match:
+        return np.nan
+    value = float(match.group(1).replace(",", ""))
+    unit = (match.group(2) or "").lower()
+    if unit == "%":
+        return value / 100 * base_amount
+    value *= _UNIT_MULTIPLIERS.get(unit, 1)
+    if _MONTHLY_PATTERN.search(text):
+        value *= 12
+    return value
+
+def _fx_rate(currency):
+    """Units of OFFER_BASE_CURRENCY per unit of currency; NaN for currencies without a configured rate."""
+    rates = CURRENCY_RATES_TO_INR
+    if currency not in rates or OFFER_BASE_CURRENCY not in rates:
+        return np.nan
+    return rates[currency] / rates[OFFER_BASE_CURRENCY]
+
+def normalize_offer(offer, file_name=""):
+    """Flattens one analyze_offer_text result into a row of OFFER_COLUMNS."""
+    currency_text = str(offer.get("currency") or "").strip()
+    amounts_text = " ".join(str(offer.get(field) or "") for field in ("base_salary", "total_ctc", "bonus", "equity"))
+    # The LLM's currency is free text ("INR", "Indian Rupees", "₹"); only configured codes are trusted as-is.
+    # Only an offer that names no currency anywhere is assumed to be in OFFER_BASE_CURRENCY; a foreign or
+    # unrecognised one keeps its name and gets no fx_rate, so its amounts stay NaN rather than being misread.
+    currency = currency_text.upper()
+    if currency not in CURRENCY_RATES_TO_INR:
+        currency = detect_currency(currency_text) or detect_currency(amounts_text)
+    if not currency:
+        currency = OFFER_BASE_CURRENCY if currency_text.lower() in _UNSPECIFIED_CURRENCY else currency_text
+    fx_rate = _fx_rate(currency)
+
+    base = parse_money(offer.get("base_salary"))
+    bonus = parse_money(offer.get("bonus"), base)
+    equity = parse_money(offer.get("equity"))
+    ctc = parse_money(offer.get("total_ctc"))
+    if np.isnan(ctc):
+        ctc = np.nansum([base, bonus, equity]) if not np.isnan([base, bonus, equity]).all() else np.nan
+
+    return {
+        "file_name": file_name,
+        "company": offer.get("company") or "",
+        "role": offer.get("role") or "",
+        "location": offer.get("location") or "",
+        "currency": currency,
+        "fx_rate": fx_rate,
+        "base_annual": base * fx_rate,
+        "bonus_annual": bonus * fx_rate,
+        "equity_annual": equity * fx_rate,
+        "joining_bonus": parse_money(offer.get("joining_bonus")) * fx_rate,
+        "ctc_annual": ctc * fx_rate,
+        "benefits_count": len(offer.get("other_benefits") or []),
+    }
+
+def offers_frame(rows):
+    """Builds a typed DataFrame from normalized offer rows."""
+    return pd.DataFrame(rows, columns=list(OFFER_COLUMNS)).astype(OFFER_COLUMNS)
+
+def add_market_percentiles(frame):
+    """
+    Adds the salary table's min/median/max for each offer's role and location, and where the
+    offer's CTC falls between them as a percentile (min=0, median=50, max=100, linear in between).
+    Each distinct role/location pair is looked up once.
+    """
+    frame = frame.copy()
+    pairs = frame[["role", "location"]].fillna("").drop_duplicates()
+    market = []
+    for role, location in pairs.itertuples(index=False):
+        row = lookup_salary(role, location) if role else None
+        market.append({
+            "role": role, "location": location,
+            "market_min": row["min_pay"] if row else np.nan,
+            "market_median": row["median_pay"] if row else np.nan,
+            "market_max": row["max_pay"] if row else np.nan,
+            "market_source": row["source"] if row else "",
+            "market_location": row["location"] if row else "",
+            "market_location_found": row["location_found"] if row else pd.NA,
+        })
+    market = pd.DataFrame(market, columns=["role", "location", "market_min", "market_median", "market_max",
+                                   "market_source", "market_location", "market_location_found"])
+    keys = frame[["role", "location"]].fillna("")
+    merged = keys.merge(market, on=["role", "location"], how="left")
+
+    # The salary table is in INR; convert it to the comparison currency.
+    inr_per_base = CURRENCY_RATES_TO_INR.get(OFFER_BASE_CURRENCY, np.nan)
+    for column in ("market_min", "market_median", "market_max"):
+        frame[column] = merged[column].to_numpy(dtype="float64") / inr_per_base
+    for column in ("market_source", "market_location", "market_location_found"):
+        frame[column] = merged[column].to_numpy()
+
+    ctc = frame["ctc_annual"].to_numpy()
+    low, median, high = (frame[column].to_numpy() for column in ("market_min", "market_median", "market_max"))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        below = 50 * (ctc - low) / (median - low)
+        above = 50 + 50 * (ctc - median) / (high - median)
+    frame["market_percentile"] = np.clip(np.where(ctc <= median, below, above), 0, 100)
+    return frame.astype(MARKET_COLUMNS)
+
+def rank_offers(frame, weights=None):
+    """
+    Scores offers as a weighted sum of min-max scaled columns (missing values score 0) and
+    returns them sorted by rank. Negative weights penalise a column.
+    """
+    weights = {column: weight for column, weight in (weights or DEFAULT_OFFER_WEIGHTS).items() if weight and column in frame}
+    frame = frame.copy()
+    if not weights or frame.empty:
+        frame["score"] = 0.0
+        frame["rank"] = 1
+        return frame
+
+    values = frame[list(weights)].astype("float64")
+    low, spread = values.min(), (values.max() - values.min()).replace(0, 1)
+    scaled = ((values - low) / spread).fillna(0)
+    weight_series = pd.Series(weights, dtype="float64")
+    frame["score"] = scaled.mul(weight_series).sum(axis=1) / weight_series.abs().sum()
+    frame["rank"] = frame["score"].rank(ascending=False, method="min").astype("int64")
+    return frame.sort_values(["rank", "file_name"])
+
+def export_offers(frame, path_or_format):
+    """
+    Writes the offers to a .csv or .parquet path, or returns bytes when given just "csv" or "parquet".
+    Parquet needs pyarrow (or fastparquet) installed.
+    """
+    file_format = path_or_format.rsplit(".", 1)[-1].lower()
+    target = io.BytesIO() if path_or_format in ("csv", "parquet") else path_or_format
+    if file_format == "parquet":
+        try:
+            frame.to_parquet(target, index=False)
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+    elif file_format == "csv":
+        frame.to_csv(target, index=False)
+    else:
+        raise ValueError(f"Unsupported export format '{file_format}'. Use .csv or .parquet.")
+    return target.getvalue() if isinstance(target, io.BytesIO) else os.path.abspath(target)
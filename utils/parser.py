@@ -1,14 +1,153 @@
+import io
+import os
+import atexit
+import hashlib
+import tempfile
+import itertools
+import threading
+from collections import deque
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
 import pypdf
+from utils.cache import ResultCache, make_cache_key
+from utils.metrics import timed, increment, collect_timing, record_timings
+from config.config import (
+    RESULT_CACHE_SIZE, RESULT_CACHE_DIR, PDF_MAX_BYTES, PDF_MAX_PAGES, PDF_MAX_CHARS,
+    PDF_PARSE_WORKERS, PDF_PARALLEL_MIN_PAGES, PDF_PAGES_PER_TASK
+)
 
-def extract_text_from_pdf(pdf_file):
-    """Extracts text from an uploaded PDF file."""
+_text_cache = ResultCache("pdf_text", max_entries=RESULT_CACHE_SIZE, disk_dir=RESULT_CACHE_DIR)
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+# (file key, PdfReader) of the document an extraction worker process opened last.
+_worker_reader = None
+
+def _read_pdf_bytes(pdf_file):
+    """Returns the raw bytes of an uploaded file, file object or path."""
+    if isinstance(pdf_file, bytes):
+        return pdf_file
+    if hasattr(pdf_file, "getvalue"):
+        return pdf_file.getvalue()
+    if hasattr(pdf_file, "read"):
+        data = pdf_file.read()
+        if hasattr(pdf_file, "seek"):
+            pdf_file.seek(0)
+        return data
+    with open(pdf_file, "rb") as f:
+        return f.read()
+
+def _get_page_pool(workers):
+    """Returns the process pool shared by page-parallel extractions, starting it on first use."""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(max_workers=workers)
+            atexit.register(_page_pool.shutdown, wait=False, cancel_futures=True)
+        return _page_pool
+
+def _extract_page_range(path, start, stop):
+    """
+    Extracts the text of pages [start, stop) of the PDF at path. Runs inside extraction worker
+    processes: each opens a document once and keeps its reader for later batches of the same file.
+    Returns the texts and the stage timings for the parent to record.
+    """
+    global _worker_reader
+    timings = {}
+    with collect_timing(timings, "pdf.parse.page_batch"):
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        if _worker_reader is None or _worker_reader[0] != key:
+            _worker_reader = (key, pypdf.PdfReader(path))
+        reader = _worker_reader[1]
+        texts = [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+    return texts, timings
+
+def _check_size(size, max_bytes):
+    if max_bytes and size > max_bytes:
+        raise ValueError(f"the file is {size / 2**20:.1f} MB; the limit is {max_bytes / 2**20:.1f} MB")
+
+def iter_pdf_pages(pdf_file, max_pages=PDF_MAX_PAGES, max_bytes=PDF_MAX_BYTES, workers=PDF_PARSE_WORKERS):
+    """
+    Yields the text of each page, in order, as soon as it has been extracted. Files over max_bytes
+    raise ValueError and only the first max_pages pages are read. Documents with at least
+    PDF_PARALLEL_MIN_PAGES pages are extracted in batches of pages across a process pool, at most
+    one batch per worker ahead of the caller, so closing the generator early stops the work.
+    Workers get the file's path rather than its bytes (uploads are spooled to a temp file once).
+    """
+    path = os.fspath(pdf_file) if isinstance(pdf_file, (str, os.PathLike)) else None
+    if path is not None:
+        _check_size(os.path.getsize(path), max_bytes)
+        reader = pypdf.PdfReader(path)
+    else:
+        data = _read_pdf_bytes(pdf_file)
+        _check_size(len(data), max_bytes)
+        reader = pypdf.PdfReader(io.BytesIO(data))
+    page_count = min(len(reader.pages), max_pages) if max_pages else len(reader.pages)
+    if page_count < len(reader.pages):
+        increment("pages_skipped", "pdf.parse", len(reader.pages) - page_count)
+
+    if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        for i in range(page_count):
+            yield reader.pages[i].extract_text() or ""
+        return
+
+    tmp_path = None
+    if path is None:
+        fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        path = tmp_path
+
+    pool = _get_page_pool(workers)
+    ranges = iter([(start, min(start + PDF_PAGES_PER_TASK, page_count)) for start in range(0, page_count, PDF_PAGES_PER_TASK)])
+    pending = deque(pool.submit(_extract_page_range, path, start, stop) for start, stop in itertools.islice(ranges, workers))
+    try:
+        while pending:
+            pages, timings = pending.popleft().result()
+            record_timings(timings)
+            next_range = next(ranges, None)
+            if next_range:
+                pending.append(pool.submit(_extract_page_range, path, *next_range))
+            yield from pages
+    finally:
+        for future in pending:
+            future.cancel()
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+def extract_text_from_pdf(pdf_file, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS):
+    """
+    Extracts text from an uploaded PDF file, reusing the cached text for identical files.
+    Extraction stops after max_pages pages or once max_chars characters have been collected.
+    """
     if pdf_file:
         try:
-            pdf_reader = pypdf.PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
+            if isinstance(pdf_file, (str, os.PathLike)):
+                _check_size(os.path.getsize(pdf_file), PDF_MAX_BYTES)
+            data = _read_pdf_bytes(pdf_file)
+            cache_key = make_cache_key(hashlib.sha256(data).hexdigest(), max_pages, max_chars)
+            cached_text = _text_cache.get(cache_key)
+            if cached_text is not None:
+                return cached_text
+
+            # Paths go through as paths so page workers can open the file themselves.
+            source = pdf_file if isinstance(pdf_file, (str, os.PathLike)) else data
+            with timed("pdf.parse"):
+                pages, length = [], 0
+                with closing(iter_pdf_pages(source, max_pages=max_pages)) as page_texts:
+                    for page_text in page_texts:
+                        pages.append(page_text)
+                        length += len(page_text)
+                        if max_chars and length >= max_chars:
+                            break
+                text = "".join(pages)[:max_chars or None]
+            increment("pages", "pdf.parse", len(pages))
+            _text_cache.set(cache_key, text)
             return text
         except Exception as e:
             return f"Error reading PDF: {e}"
-    return None
\ No newline at end of file
+    return None
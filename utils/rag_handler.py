@@ -1,48 +1,405 @@
 import os
+import json
+import shutil
+import hashlib
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import PyPDFDirectoryLoader
+from langchain_community.document_loaders import PyPDFLoader
+from utils.salary_table import lookup_salary, format_salary_row
+from utils.metrics import timed, increment, collect_timing, record_timings
+from utils.cache import ResultCache, make_cache_key
+from utils.context import assemble_context
+from utils.http_client import normalize_query
+from utils.faiss_index import index_build_settings, apply_search_params, supports_removal, convert_index
+from utils.shared_index import export_shared_index, load_shared_index, build_lock
+from utils.doc_metadata import tag_documents, detect_region, METADATA_VERSION
+from utils.sharded_store import ShardedVectorStore
+from config.config import (
+    DOCUMENTS_DIR, VECTOR_STORE_DIR, CHUNK_SIZE, CHUNK_OVERLAP, INGEST_WORKERS, EMBED_BATCH_SIZE, FAISS_INDEX_TYPE,
+    VECTOR_STORE_MODE, SHARED_INDEX_DIR, RETRIEVAL_TOP_K, QUERY_CACHE_SIZE, CONTEXT_TOKEN_BUDGET,
+    VECTOR_STORE_SHARDING, SALARY_COLLECTIONS, SALARY_MAX_AGE_YEARS, RETRIEVAL_FILTER_FETCH_K
+)
 
-def setup_vector_store(embedding_model, docs_path="documents"):
+MANIFEST_FILE = "manifest.json"
+DOCUMENT_TAGS_FILE = "document_tags.json"
+SHARDS_DIR = "shards"
+NO_SALARY_DATA_MESSAGE = "Could not find any relevant salary data in the knowledge base for this target role."
+
+_query_embedding_cache = ResultCache("query_embedding", max_entries=QUERY_CACHE_SIZE)
+_retrieval_cache = ResultCache("retrieval", max_entries=QUERY_CACHE_SIZE)
+
+def _file_sha256(path):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _list_pdfs(docs_path):
+    """Returns the sorted, docs_path-relative paths of every PDF under docs_path."""
+    pdfs = []
+    for root, _, files in os.walk(docs_path):
+        for name in files:
+            if name.lower().endswith(".pdf") and not name.startswith("."):
+                pdfs.append(os.path.relpath(os.path.join(root, name), docs_path))
+    return sorted(pdfs)
+
+def _embedding_fingerprint(embedding_model):
+    """Identifies the embedding space: the model, the backend running it and its normalization."""
+    encode_kwargs = getattr(embedding_model, "encode_kwargs", None) or {}
+    return {
+        "embedding_model": getattr(embedding_model, "model_name", type(embedding_model).__name__),
+        "embedding_backend": getattr(embedding_model, "backend", None) or type(embedding_model).__name__,
+        "embedding_normalize": bool(encode_kwargs.get("normalize_embeddings", False)),
+    }
+
+def _index_settings(embedding_model):
+    """Settings that, when changed, invalidate every stored vector."""
+    return {
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        **_embedding_fingerprint(embedding_model),
+        "metadata_version": METADATA_VERSION,
+        **index_build_settings(FAISS_INDEX_TYPE),
+    }
+
+def _load_manifest(index_dir):
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Ignoring unreadable index manifest at {path}: {e}")
+        return None
+
+def _manifest_version(manifest):
+    """Content hash of the indexed settings and files; used to key caches of search results."""
+    return make_cache_key(manifest["settings"], {rel: entry["sha256"] for rel, entry in manifest["files"].items()})[:16]
+
+def _save_manifest(index_dir, manifest):
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _load_and_split(path, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
+    """
+    Loads a single PDF and splits it into chunks. Runs inside ingestion worker processes, so it
+    returns its stage timings alongside the chunks for the parent to record.
+    """
+    # start_index lets context assembly order neighbouring chunks by position before merging them.
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True)
+    timings = {}
+    with collect_timing(timings, "ingest.parse"):
+        documents = PyPDFLoader(path).load()
+    with collect_timing(timings, "ingest.split"):
+        splits = text_splitter.split_documents(documents)
+    return splits, timings
+
+def _iter_parsed_pdfs(paths, workers=INGEST_WORKERS):
+    """
+    Yields (path, splits) for each PDF as soon as it has been parsed.
+    With more than one worker, parsing fans out across a process pool so the caller
+    can embed finished files while the rest are still being parsed.
+    """
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            splits, timings = _load_and_split(path)
+            record_timings(timings)
+            yield path, splits
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        futures = {pool.submit(_load_and_split, path, CHUNK_SIZE, CHUNK_OVERLAP): path for path in paths}
+        for future in as_completed(futures):
+            splits, timings = future.result()
+            record_timings(timings)
+            yield futures[future], splits
+
+def _embed_batch(vectorstore, embedding_model, batch):
+    """Embeds one batch of (id, Document) pairs and adds it to the vector store."""
+    texts = [doc.page_content for _, doc in batch]
+    with timed("ingest.embed_batch"):
+        text_embeddings = list(zip(texts, embedding_model.embed_documents(texts)))
+    increment("chunks", "ingest.embed_batch", len(texts))
+    metadatas = [doc.metadata for _, doc in batch]
+    ids = [doc_id for doc_id, _ in batch]
+    if vectorstore is None:
+        return FAISS.from_embeddings(text_embeddings, embedding_model, metadatas=metadatas, ids=ids)
+    vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+    return vectorstore
+
+def _ingest_pdfs(vectorstore, embedding_model, docs_path, files, metadata_by_rel, batch_size=EMBED_BATCH_SIZE):
+    """
+    Parses, splits and embeds the given {relative_path: sha256} files, tagging every chunk with
+    its document's metadata (source, doc_type, region, year).
+    Chunks stream from the parsing stage into fixed-size embedding batches.
+    Returns the updated vector store and a {relative_path: ids} mapping.
     """
-    Loads docs, splits them, and builds a vector store using a provided embedding model.
+    rel_by_path = {os.path.join(docs_path, rel): rel for rel in files}
+    ids_by_rel = {}
+    batch = []
+    for path, splits in _iter_parsed_pdfs(list(rel_by_path)):
+        rel = rel_by_path[path]
+        for split in splits:
+            split.metadata.update(metadata_by_rel[rel])
+        id_prefix = hashlib.sha1(f"{rel}:{files[rel]}".encode("utf-8")).hexdigest()[:16]
+        ids_by_rel[rel] = [f"{id_prefix}-{i}" for i in range(len(splits))]
+        batch.extend(zip(ids_by_rel[rel], splits))
+        while len(batch) >= batch_size:
+            vectorstore = _embed_batch(vectorstore, embedding_model, batch[:batch_size])
+            batch = batch[batch_size:]
+    if batch:
+        vectorstore = _embed_batch(vectorstore, embedding_model, batch)
+    return vectorstore, ids_by_rel
+
+def setup_vector_store(embedding_model, docs_path=DOCUMENTS_DIR, index_dir=VECTOR_STORE_DIR, files=None, metadata_by_rel=None):
+    """
+    Loads the persisted vector store and brings it up to date with docs_path (or just the given
+    relative paths in files). Only PDFs that were added, changed or deleted since the last run are re-embedded.
     """
     if not os.path.exists(docs_path) or not os.listdir(docs_path):
         return None
-    
-    loader = PyPDFDirectoryLoader(docs_path)
-    documents = loader.load()
-    
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    splits = text_splitter.split_documents(documents)
-    
-    vectorstore = FAISS.from_documents(documents=splits, embedding=embedding_model)
+
+    files = _list_pdfs(docs_path) if files is None else files
+    current_files = {rel: _file_sha256(os.path.join(docs_path, rel)) for rel in files}
+    if not current_files:
+        return None
+    if metadata_by_rel is None:
+        metadata_by_rel = tag_documents(docs_path, current_files, os.path.join(index_dir, DOCUMENT_TAGS_FILE))
+
+    settings = _index_settings(embedding_model)
+    manifest = _load_manifest(index_dir)
+    vectorstore = None
+    if manifest and manifest.get("settings") == settings:
+        try:
+            with timed("ingest.load_index"):
+                vectorstore = FAISS.load_local(index_dir, embedding_model, allow_dangerous_deserialization=True)
+            apply_search_params(vectorstore.index)
+        except Exception as e:
+            print(f"Could not load saved vector store, rebuilding: {e}")
+    if vectorstore is not None and not supports_removal(vectorstore.index):
+        if any(current_files.get(rel) != entry["sha256"] for rel, entry in manifest["files"].items()):
+            print("The saved index cannot delete vectors; rebuilding it to drop changed documents.")
+            vectorstore = None
+    if vectorstore is None:
+        manifest = {"settings": settings, "files": {}}
+
+    indexed_files = manifest["files"]
+    stale = [rel for rel, entry in indexed_files.items() if current_files.get(rel) != entry["sha256"]]
+    fresh = [rel for rel, sha in current_files.items() if rel not in indexed_files or rel in stale]
+    if not stale and not fresh:
+        vectorstore.index_version = _manifest_version(manifest)
+        vectorstore.index_settings = manifest["settings"]
+        return vectorstore
+
+    stale_ids = [doc_id for rel in stale for doc_id in indexed_files.pop(rel)["ids"]]
+    if stale_ids:
+        vectorstore.delete(stale_ids)
+
+    full_build = vectorstore is None
+    vectorstore, ids_by_rel = _ingest_pdfs(
+        vectorstore, embedding_model, docs_path, {rel: current_files[rel] for rel in fresh}, metadata_by_rel
+    )
+    for rel, ids in ids_by_rel.items():
+        indexed_files[rel] = {"sha256": current_files[rel], "ids": ids}
+
+    if vectorstore is None or vectorstore.index.ntotal == 0:
+        return None
+
+    if full_build and FAISS_INDEX_TYPE != "flat":
+        # Chunks are embedded into a flat index first, then the approximate index is trained
+        # on a sample of them; later incremental updates add to the trained index directly.
+        with timed("ingest.train_index"):
+            vectorstore.index = convert_index(vectorstore.index, FAISS_INDEX_TYPE)
+
+    os.makedirs(index_dir, exist_ok=True)
+    vectorstore.save_local(index_dir)
+    _save_manifest(index_dir, manifest)
+    vectorstore.index_version = _manifest_version(manifest)
+    vectorstore.index_settings = manifest["settings"]
+    return vectorstore
+
+def setup_sharded_vector_store(embedding_model, docs_path=DOCUMENTS_DIR, index_dir=VECTOR_STORE_DIR):
+    """
+    Builds or updates one vector store per collection (document type) under index_dir/shards/<collection>,
+    each synced incrementally like setup_vector_store. Returns a ShardedVectorStore, or None without documents.
+    """
+    if not os.path.exists(docs_path) or not os.listdir(docs_path):
+        return None
+    current_files = {rel: _file_sha256(os.path.join(docs_path, rel)) for rel in _list_pdfs(docs_path)}
+    if not current_files:
+        return None
+
+    shards_dir = os.path.join(index_dir, SHARDS_DIR)
+    metadata_by_rel = tag_documents(docs_path, current_files, os.path.join(shards_dir, DOCUMENT_TAGS_FILE))
+    files_by_collection = {}
+    for rel in current_files:
+        files_by_collection.setdefault(metadata_by_rel[rel]["doc_type"], []).append(rel)
+
+    shards = {}
+    for collection, files in sorted(files_by_collection.items()):
+        with timed(f"ingest.shard.{collection}"):
+            shard = setup_vector_store(
+                embedding_model, docs_path, os.path.join(shards_dir, collection), files=files, metadata_by_rel=metadata_by_rel
+            )
+        if shard is not None:
+            shards[collection] = shard
+
+    # Drop shards of collections that no longer have any documents.
+    for name in os.listdir(shards_dir):
+        shard_dir = os.path.join(shards_dir, name)
+        if name not in files_by_collection and os.path.exists(os.path.join(shard_dir, MANIFEST_FILE)):
+            shutil.rmtree(shard_dir, ignore_errors=True)
+
+    return ShardedVectorStore(shards, embedding_model) if shards else None
+
+def load_vector_store(embedding_model, docs_path=DOCUMENTS_DIR, mode=VECTOR_STORE_MODE, shared_dir=SHARED_INDEX_DIR):
+    """
+    Returns the vector store for the configured mode. In "mmap" mode every worker attaches to the
+    published read-only index. When none is usable, workers take the shared directory's build lock
+    and check again, so only the first one to get the lock builds and publishes; the rest attach to its version.
+    Republish after changing documents with `python -m utils.shared_index`.
+    """
+    if mode != "mmap":
+        if VECTOR_STORE_SHARDING == "collection":
+            return setup_sharded_vector_store(embedding_model, docs_path)
+        return setup_vector_store(embedding_model, docs_path)
+
+    settings = _index_settings(embedding_model)
+    vectorstore = load_shared_index(embedding_model, shared_dir, settings=settings)
+    if vectorstore is None:
+        with build_lock(shared_dir):
+            vectorstore = load_shared_index(embedding_model, shared_dir, settings=settings)
+            if vectorstore is None:
+                built = setup_vector_store(embedding_model, docs_path)
+                if built is None:
+                    return None
+                export_shared_index(built, shared_dir)
+                del built
+                vectorstore = load_shared_index(embedding_model, shared_dir)
     return vectorstore
 
-def retrieve_context(query, vectorstore):
+def _index_version(vectorstore):
+    """Identifies the indexed content; stores without a recorded version fall back to their identity and size."""
+    version = getattr(vectorstore, "index_version", None)
+    return version or f"{id(vectorstore.index)}:{vectorstore.index.ntotal}"
+
+def _is_tagged(vectorstore):
+    """Whether the store's chunks carry document metadata; indexes built before tagging do not."""
+    if isinstance(vectorstore, ShardedVectorStore):
+        return True
+    settings = getattr(vectorstore, "index_settings", None) or {}
+    return settings.get("metadata_version") is not None
+
+def _metadata_filter(collections=None, region=None, min_year=None):
+    """Builds a chunk metadata predicate, or None when nothing is filtered. Chunks of unknown year pass min_year."""
+    if not (collections or region or min_year):
+        return None
+
+    def matches(metadata):
+        year = metadata.get("year")
+        return (
+            (not collections or metadata.get("doc_type") in collections)
+            and (not region or metadata.get("region") == region)
+            and (not min_year or year is None or year >= min_year)
+        )
+    return matches
+
+def _filtered_search(vectorstore, embedding, k, collections, region, min_year):
+    if isinstance(vectorstore, ShardedVectorStore):
+        return vectorstore.similarity_search_by_vector(
+            embedding, k=k, collections=collections, filter=_metadata_filter(region=region, min_year=min_year),
+            fetch_k=RETRIEVAL_FILTER_FETCH_K,
+        )
+    metadata_filter = _metadata_filter(collections, region, min_year)
+    if metadata_filter is None:
+        return vectorstore.similarity_search_by_vector(embedding, k=k)
+    return vectorstore.similarity_search_by_vector(
+        embedding, k=k, filter=metadata_filter, fetch_k=min(vectorstore.index.ntotal, RETRIEVAL_FILTER_FETCH_K)
+    )
+
+def _search_by_vector(vectorstore, embedding, k, collections=None, region=None, min_year=None):
     """
-    Retrieves relevant context from the vector store based on a query.
+    Searches only the given collections (selected shards, or a doc_type filter on a single index).
+    region and min_year are preferences: without matching chunks, the collections are searched without them.
+    Collections are not relaxed, so a salary search never returns negotiation or policy chunks.
+    """
+    if not _is_tagged(vectorstore):
+        # Indexes built before documents were tagged have no metadata to filter on.
+        return vectorstore.similarity_search_by_vector(embedding, k=k)
+    docs = _filtered_search(vectorstore, embedding, k, collections, region, min_year)
+    if not docs and (region or min_year):
+        docs = _filtered_search(vectorstore, embedding, k, collections, None, None)
+    return docs
+
+def search_documents(query, vectorstore, k=RETRIEVAL_TOP_K, collections=None, region=None, min_year=None):
+    """
+    Returns the top-k chunks for a query, optionally from the given collections only, preferring
+    chunks from the given region and published in or after min_year.
+    Query embeddings are cached per embedding model and results per index version, so repeated
+    queries skip both the encoder and the FAISS search, and results from an older index are never served.
+    """
+    normalized = normalize_query(query)[0]
+    collections = sorted(collections) if collections else None
+    result_key = make_cache_key(_index_version(vectorstore), normalized, k, collections, region, min_year)
+    docs = _retrieval_cache.get(result_key)
+    if docs is not None:
+        return docs
+
+    embedding_model = vectorstore.embeddings
+    embedding_key = make_cache_key(_embedding_fingerprint(embedding_model), normalized)
+    embedding = _query_embedding_cache.get(embedding_key)
+    if embedding is None:
+        with timed("rag.embed_query"):
+            embedding = embedding_model.embed_query(normalized)
+        _query_embedding_cache.set(embedding_key, embedding)
+
+    with timed("rag.search"):
+        docs = _search_by_vector(vectorstore, embedding, k, collections, region, min_year)
+    _retrieval_cache.set(result_key, docs)
+    return docs
+
+def retrieve_context(query, vectorstore, max_tokens=CONTEXT_TOKEN_BUDGET, collections=None, region=None, min_year=None):
+    """
+    Retrieves relevant context from the vector store based on a query, optionally from the given collections only
+    and preferring the given region and recent documents (see search_documents).
+    Overlapping and duplicate chunks are collapsed and the result fits within max_tokens.
     """
     if not vectorstore:
         return None
         
-    retriever = vectorstore.as_retriever()
-    retrieved_docs = retriever.invoke(query)
+    retrieved_docs = search_documents(query, vectorstore, collections=collections, region=region, min_year=min_year)
     
     if not retrieved_docs:
         return None
         
-    return "\n\n".join([doc.page_content for doc in retrieved_docs])
+    context, _ = assemble_context(retrieved_docs, max_tokens)
+    return context or None
 
-def get_targeted_salary_estimation(resume_data, target_role, target_location, vectorstore, llm, response_mode="Detailed"):
+def _build_salary_estimation_prompt(resume_data, target_role, target_location, vectorstore, response_mode="Detailed"):
     """
-    Compares a resume profile against a target role and uses RAG to estimate salary.
+    Builds the salary estimation prompt, or returns None if no salary data is available for the role.
+    Uses the structured salary table when it has a matching row, and falls back to RAG otherwise.
     """
-    rag_query = f"What is the salary range for a '{target_role}' in {target_location}?"
-    context = retrieve_context(rag_query, vectorstore)
+    salary_row = lookup_salary(target_role, target_location)
+    if salary_row:
+        context = format_salary_row(salary_row)
+    else:
+        rag_query = f"What is the salary range for a '{target_role}' in {target_location}?"
+        context = retrieve_context(
+            rag_query, vectorstore, collections=SALARY_COLLECTIONS, region=detect_region(target_location),
+            min_year=date.today().year - SALARY_MAX_AGE_YEARS,
+        )
     
     if not context:
-        return "Could not find any relevant salary data in the knowledge base for this target role."
+        return None
 
     experience = resume_data.get("total_experience_years", "Not specified")
     skills = resume_data.get("technical_skills", {}).get("libraries_and_technologies", [])
@@ -53,7 +410,7 @@ def get_targeted_salary_estimation(resume_data, target_role, target_location, ve
     else:
         style_instruction = "Provide a detailed, in-depth analysis. Justify your reasoning with specific data points from the context."
 
-    final_prompt = f"""
+    return f"""
     You are an expert career coach and compensation analyst. Based on the following context from salary reports, provide a salary range for the target role and analyze the candidate's fit.
     {style_instruction}
 
@@ -70,6 +427,27 @@ def get_targeted_salary_estimation(resume_data, target_role, target_location, ve
     - Total Experience: {experience}
     - Key Skills: {', '.join(skills[:5])}
     """
+
+def get_targeted_salary_estimation(resume_data, target_role, target_location, vectorstore, llm, response_mode="Detailed"):
+    """
+    Compares a resume profile against a target role and estimates salary.
+    """
+    final_prompt = _build_salary_estimation_prompt(resume_data, target_role, target_location, vectorstore, response_mode)
+    if not final_prompt:
+        return NO_SALARY_DATA_MESSAGE
     
     response = llm.invoke(final_prompt)
-    return response.content
\ No newline at end of file
+    return response.content
+
+def stream_targeted_salary_estimation(resume_data, target_role, target_location, vectorstore, llm, response_mode="Detailed"):
+    """
+    Streaming variant of get_targeted_salary_estimation; yields text chunks as the LLM produces them.
+    """
+    final_prompt = _build_salary_estimation_prompt(resume_data, target_role, target_location, vectorstore, response_mode)
+    if not final_prompt:
+        yield NO_SALARY_DATA_MESSAGE
+        return
+
+    for chunk in llm.stream(final_prompt):
+        if chunk.content:
+            yield chunk.content
@@ -0,0 +1,138 @@
+import re
+from datetime import date
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# Optional country code, then 10-12 digits with optional spaces, dashes, dots or brackets between groups.
+PHONE_RE = re.compile(r"(?<![\w/])(?:\+\d{1,3}[\s.-]?)?(?:\(?\d{2,5}\)?[\s.-]?){1,3}\d{3,5}(?![\w/])")
+URL_RE = re.compile(
+    r"(?:https?://|www\.)[^\s<>()|,]+|(?<![\w@.])(?:[\w-]+\.)*(?:linkedin\.com|github\.com|gitlab\.com|kaggle\.com|medium\.com)/[^\s<>()|,]+",
+    re.IGNORECASE,
+)
+LINK_SITES = {
+    "linkedin.com": "LinkedIn", "github.com": "GitHub", "gitlab.com": "GitLab",
+    "kaggle.com": "Kaggle", "medium.com": "Medium",
+}
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH_NAME = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+_DATE = rf"(?:{_MONTH_NAME}\.?,?\s*'?\d{{2,4}}|\d{{1,2}}\s*[/.-]\s*\d{{4}}|\d{{4}}\s*[/.-]\s*\d{{1,2}}(?!\d)|(?:19|20)\d{{2}})"
+_OPEN_END = r"(?:present|current(?:ly)?|now|today|till\s+date|to\s+date|ongoing)"
+DATE_RANGE_RE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to|till|until)\s*(?P<end>{_OPEN_END}|{_DATE})", re.IGNORECASE
+)
+
+# Section headings that start (and end) the work history part of a resume.
+EXPERIENCE_HEADING_RE = re.compile(
+    r"^\s*(?:work\s+experience|professional\s+experience|experience|employment(?:\s+history)?|work\s+history|career\s+history)\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+OTHER_HEADING_RE = re.compile(
+    r"^\s*(?:education|academics?|projects?|personal\s+projects|skills|technical\s+skills|certifications?|achievements|awards|publications|interests|hobbies|languages|summary|profile|objective)\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+def _parse_date(value, today, is_end=False):
+    """
+    Parses a resume date into (year, month). A year-only date counts from January when it starts
+    a range, and to December (or the current month, in the current year) when it ends one.
+    """
+    value = value.strip().lower()
+    if re.fullmatch(_OPEN_END, value):
+        return today.year, today.month
+    month_name = re.match(r"([a-z]+)\.?,?\s*'?(\d{2,4})", value)
+    if month_name:
+        year = int(month_name.group(2))
+        return (year + 2000 if year < 100 else year), MONTHS.get(month_name.group(1)[:3], 1)
+    numbers = [int(n) for n in re.findall(r"\d+", value)]
+    if len(numbers) == 2:
+        year, month = (numbers[1], numbers[0]) if numbers[1] > 31 else (numbers[0], numbers[1])
+        return year, min(max(month, 1), 12)
+    year = numbers[0]
+    if not is_end:
+        return year, 1
+    return year, today.month if year == today.year else 12
+
+def _experience_section(text):
+    """Returns the work history section, or the whole text minus any education section if there is no heading."""
+    heading = EXPERIENCE_HEADING_RE.search(text)
+    if heading:
+        following = OTHER_HEADING_RE.search(text, heading.end())
+        return text[heading.end():following.start() if following else len(text)]
+    education = re.search(r"^\s*(?:education|academics?)\s*:?\s*$", text, re.IGNORECASE | re.MULTILINE)
+    if education:
+        following = OTHER_HEADING_RE.search(text, education.end())
+        return text[:education.start()] + (text[following.start():] if following else "")
+    return text
+
+def extract_date_ranges(text, today=None):
+    """Returns [(start_year, start_month, end_year, end_month)] for every date range in text."""
+    today = today or date.today()
+    ranges = []
+    for match in DATE_RANGE_RE.finditer(text):
+        start = _parse_date(match.group("start"), today)
+        end = _parse_date(match.group("end"), today, is_end=True)
+        if start <= end <= (today.year, today.month):
+            ranges.append(start + end)
+    return ranges
+
+def compute_experience_years(text, today=None):
+    """
+    Sums the months covered by date ranges in the work history, counting overlapping roles once.
+    Returns a string like '2.5 years', or '' when no dated roles are found.
+    """
+    ranges = sorted(extract_date_ranges(_experience_section(text), today))
+    months = 0
+    current_start = current_end = None
+    for start_year, start_month, end_year, end_month in ranges:
+        start, end = start_year * 12 + start_month - 1, end_year * 12 + end_month
+        if current_end is not None and start <= current_end:
+            current_end = max(current_end, end)
+            continue
+        if current_end is not None:
+            months += current_end - current_start
+        current_start, current_end = start, end
+    if current_end is not None:
+        months += current_end - current_start
+    if not months:
+        return ""
+    years = round(months / 12 * 2) / 2
+    return f"{years:g} years" if years != 1 else "1 year"
+
+def extract_links(text):
+    """Returns [{"site", "url"}] for every distinct URL, naming well-known profile sites."""
+    links, seen = [], set()
+    for match in URL_RE.finditer(text):
+        url = match.group(0).rstrip(".;:")
+        key = url.lower().split("://")[-1].removeprefix("www.").rstrip("/")
+        if key in seen:
+            continue
+        seen.add(key)
+        domain = key.split("/")[0]
+        site = next((name for host, name in LINK_SITES.items() if domain.endswith(host)), "Website")
+        links.append({"site": site, "url": url})
+    return links
+
+def extract_phone(text):
+    """Returns the first phone-like number with 10 to 13 digits, as written."""
+    for match in PHONE_RE.finditer(text):
+        candidate = match.group(0).strip()
+        digits = re.sub(r"\D", "", candidate)
+        if 10 <= len(digits) <= 13 and not DATE_RANGE_RE.fullmatch(candidate):
+            return candidate
+    return ""
+
+def extract_resume_fields(text, today=None):
+    """
+    Extracts the resume fields that regex and date arithmetic get exactly right, so the LLM
+    does not have to: email, phone, links and total_experience_years (relative to today).
+    """
+    email = EMAIL_RE.search(text)
+    return {
+        "email": email.group(0) if email else "",
+        "phone": extract_phone(text),
+        "links": extract_links(text),
+        "total_experience_years": compute_experience_years(text, today),
+    }
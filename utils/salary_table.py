@@ -0,0 +1,207 @@
+import os
+import re
+import json
+import argparse
+import threading
+import pypdf
+from config.config import DOCUMENTS_DIR, SALARY_TABLE_PATH, SALARY_TABLE_SOURCES
+
+COLUMNS = ["role", "seniority", "location", "min_pay", "median_pay", "max_pay", "source"]
+
+SENIORITY_WORDS = {
+    "intern": "entry", "trainee": "entry", "fresher": "entry", "entry": "entry", "junior": "junior",
+    "associate": "junior", "mid": "mid", "senior": "senior", "sr": "senior", "lead": "lead",
+    "principal": "lead", "staff": "lead", "head": "head", "director": "head", "vp": "head",
+}
+
+CITY_ALIASES = {
+    "bangalore": "bengaluru", "bengaluru": "bengaluru", "bombay": "mumbai", "mumbai": "mumbai",
+    "gurgaon": "gurugram", "gurugram": "gurugram", "delhi": "delhi", "new delhi": "delhi", "ncr": "delhi",
+    "noida": "noida", "pune": "pune", "hyderabad": "hyderabad", "chennai": "chennai",
+    "madras": "chennai", "kolkata": "kolkata", "calcutta": "kolkata", "ahmedabad": "ahmedabad",
+}
+
+_AMOUNT_PATTERN = re.compile(
+    r"(?:₹|rs\.?|inr)?\s*(\d[\d,]*(?:\.\d+)?)\s*(lpa|lakhs?|lacs?|l|cr|crores?|k)?\b", re.IGNORECASE
+)
+_EXPERIENCE_PATTERN = re.compile(r"(\d+)\s*(?:-|–|to)\s*(\d+)\s*\+?\s*(?:yrs?|years?)", re.IGNORECASE)
+_NON_ROLE_PREFIXES = ("page", "table", "figure", "source", "note", "total", "year")
+_UNIT_MULTIPLIERS = {"l": 100_000, "lpa": 100_000, "lakh": 100_000, "lakhs": 100_000, "lac": 100_000,
+                     "lacs": 100_000, "cr": 10_000_000, "crore": 10_000_000, "crores": 10_000_000, "k": 1_000}
+
+def normalize_text(value):
+    """Lower-cases, strips punctuation and collapses whitespace."""
+    return " ".join(re.sub(r"[^a-z0-9+#]+", " ", str(value).lower()).split())
+
+def normalize_location(location):
+    """Maps a free-text location such as 'Bengaluru, India' to a canonical city name, or '' if no known city is named."""
+    text = normalize_text(location)
+    for alias in sorted(CITY_ALIASES, key=len, reverse=True):
+        if re.search(rf"\b{alias}\b", text):
+            return CITY_ALIASES[alias]
+    return ""
+
+def split_role(title):
+    """Splits a job title into (normalized role, seniority), e.g. 'Senior Data Scientist' -> ('data scientist', 'senior')."""
+    words = normalize_text(title).split()
+    seniority = next((SENIORITY_WORDS[w] for w in words if w in SENIORITY_WORDS), "")
+    role_words = [w for w in words if w not in SENIORITY_WORDS]
+    return " ".join(role_words), seniority
+
+def _seniority_from_experience(low, high):
+    if high <= 2:
+        return "entry"
+    if high <= 5:
+        return "junior" if low < 2 else "mid"
+    if high <= 10:
+        return "senior"
+    return "lead"
+
+def _parse_amounts(text, default_multiplier):
+    amounts = []
+    for number, unit in _AMOUNT_PATTERN.findall(text):
+        value = float(number.replace(",", ""))
+        if unit:
+            multiplier = _UNIT_MULTIPLIERS.get(unit.lower(), 1)
+        else:
+            multiplier = default_multiplier if value < 1_000 else 1
+        amounts.append(int(round(value * multiplier)))
+    return amounts
+
+def _parse_salary_line(line, page_location, default_multiplier):
+    """
+    Parses one table row such as 'Data Scientist  Bengaluru  8 - 14 - 22 LPA' into a row dict.
+    Returns None for lines that do not look like role + pay figures.
+    """
+    experience = _EXPERIENCE_PATTERN.search(line)
+    seniority = _seniority_from_experience(*map(int, experience.groups())) if experience else ""
+    line = _EXPERIENCE_PATTERN.sub(" ", line)
+
+    first_number = re.search(r"(?:₹|rs\.?|inr)?\s*\d", line, re.IGNORECASE)
+    if not first_number:
+        return None
+    role_text = line[:first_number.start()].strip(" :-–|")
+    amounts = [a for a in _parse_amounts(line[first_number.start():], default_multiplier) if a >= 10_000]
+    if not role_text or not 2 <= len(amounts) <= 3 or len(role_text) > 80:
+        return None
+    if role_text.lower().startswith(_NON_ROLE_PREFIXES):
+        return None
+
+    location = normalize_location(role_text) or page_location
+    for alias in CITY_ALIASES:
+        role_text = re.sub(rf"\b{alias}\b", " ", role_text, flags=re.IGNORECASE)
+    role, title_seniority = split_role(role_text)
+    if len(role) < 3:
+        return None
+
+    amounts = sorted(amounts)
+    median = amounts[1] if len(amounts) == 3 else (amounts[0] + amounts[-1]) // 2
+    return {
+        "role": role, "seniority": title_seniority or seniority, "location": location,
+        "min_pay": amounts[0], "median_pay": median, "max_pay": amounts[-1],
+    }
+
+def extract_salary_rows(pdf_path):
+    """
+    Extracts (role, seniority, location, min/median/max pay) rows from the tables of a salary guide PDF.
+    Pay figures are annual INR; bare numbers on pages quoting 'lakhs'/'LPA' are read as lakhs.
+    """
+    rows = []
+    source = os.path.basename(pdf_path)
+    for page in pypdf.PdfReader(pdf_path).pages:
+        page_text = page.extract_text() or ""
+        page_location = normalize_location(page_text[:200])
+        default_multiplier = 100_000 if re.search(r"\b(lakhs?|lpa|lacs?)\b", page_text, re.IGNORECASE) else 1
+        for line in page_text.splitlines():
+            row = _parse_salary_line(line, page_location, default_multiplier)
+            if row:
+                row["source"] = source
+                rows.append(row)
+    return rows
+
+def _lookup_keys(role, seniority, location):
+    """Keys from most to least specific; every row is indexed under each of them."""
+    return [f"{role}|{seniority}|{location}", f"{role}||{location}", f"{role}|{seniority}|", f"{role}||"]
+
+def build_salary_table(docs_path=DOCUMENTS_DIR, sources=SALARY_TABLE_SOURCES, output_path=SALARY_TABLE_PATH):
+    """
+    Offline stage: extracts salary rows from the source PDFs and writes a columnar table
+    with a lookup index on normalized (role, seniority, location).
+    """
+    table = {column: [] for column in COLUMNS}
+    index = {}
+    for name in sources:
+        path = os.path.join(docs_path, name)
+        if not os.path.exists(path):
+            print(f"Skipping missing salary source: {path}")
+            continue
+        for row in extract_salary_rows(path):
+            position = len(table["role"])
+            for column in COLUMNS:
+                table[column].append(row[column])
+            for key in _lookup_keys(row["role"], row["seniority"], row["location"]):
+                index.setdefault(key, position)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"columns": table, "index": index}, f, ensure_ascii=False, separators=(",", ":"))
+    return len(table["role"])
+
+_table = None
+_table_lock = threading.Lock()
+
+def load_salary_table(path=SALARY_TABLE_PATH):
+    """Loads the columnar salary table once per process. Returns None if it has not been built."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                if not os.path.exists(path):
+                    return None
+                with open(path, "r", encoding="utf-8") as f:
+                    _table = json.load(f)
+    return _table
+
+def lookup_salary(target_role, target_location=""):
+    """
+    Returns the best matching salary row for a role and location as a dict, or None.
+    Each candidate key is a single dict lookup, falling back from the exact seniority and
+    location to any seniority and then any location. The row also carries the key that matched
+    ("matched_key") and whether it is for the requested location ("location_found"; True when
+    no location was requested), so a fallback to another city is never presented as the target's market.
+    """
+    table = load_salary_table()
+    if not table:
+        return None
+    role, seniority = split_role(target_role)
+    location = normalize_location(target_location)
+    for key in _lookup_keys(role, seniority, location):
+        position = table["index"].get(key)
+        if position is not None:
+            row = {column: table["columns"][column][position] for column in COLUMNS}
+            row["matched_key"] = key
+            row["requested_location"] = target_location or ""
+            row["location_found"] = not target_location or bool(location and row["location"] == location)
+            return row
+    return None
+
+def format_salary_row(row):
+    """Renders a salary row as compact prompt context, saying so when it is not for the requested location."""
+    location = row["location"].title() or "India"
+    seniority = f" ({row['seniority']})" if row["seniority"] else ""
+    text = (
+        f"{row['role'].title()}{seniority}, {location}: "
+        f"min ₹{row['min_pay']:,}, median ₹{row['median_pay']:,}, max ₹{row['max_pay']:,} per year "
+        f"(source: {row['source']})"
+    )
+    if not row.get("location_found", True):
+        text += f". Location not found: no figures for {row['requested_location']}; these are for {location}."
+    return text
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the structured salary lookup table from the salary guide PDFs.")
+    parser.add_argument("--docs-path", default=DOCUMENTS_DIR)
+    parser.add_argument("--output", default=SALARY_TABLE_PATH)
+    args = parser.parse_args()
+    count = build_salary_table(args.docs_path, output_path=args.output)
+    print(f"Wrote {count} salary rows to {args.output}")
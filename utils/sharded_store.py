@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from utils.cache import make_cache_key
+from utils.metrics import timed
+
+class ShardedVectorStore:
+    """
+    A knowledge base split into one FAISS store per collection (e.g. salary, negotiation, policy).
+    Searches embed the query once, scan only the requested collections (all by default) in
+    parallel, and merge the hits by distance. All shards share one embedding model, so their
+    L2 distances are comparable.
+    """
+
+    def __init__(self, shards, embedding_model):
+        self.shards = dict(shards)
+        self.embeddings = embedding_model
+        self.index_version = make_cache_key(sorted(
+            (name, getattr(shard, "index_version", None) or shard.index.ntotal) for name, shard in self.shards.items()
+        ))[:16]
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.shards)), thread_name_prefix="shard-search")
+
+    @property
+    def ntotal(self):
+        return sum(shard.index.ntotal for shard in self.shards.values())
+
+    def select(self, collections=None):
+        """Returns the shards of the given collections (none if none of them exist), or every shard."""
+        if collections:
+            return {name: shard for name, shard in self.shards.items() if name in collections}
+        return self.shards
+
+    def similarity_search_with_score_by_vector(self, embedding, k=4, collections=None, filter=None, fetch_k=20):
+        """Searches the selected shards; filter is a chunk metadata predicate applied within each shard."""
+        shards = self.select(collections)
+        if not shards:
+            return []
+
+        def search(item):
+            name, shard = item
+            with timed(f"rag.search.shard.{name}"):
+                if filter is None:
+                    return shard.similarity_search_with_score_by_vector(embedding, k=k)
+                return shard.similarity_search_with_score_by_vector(
+                    embedding, k=k, filter=filter, fetch_k=min(shard.index.ntotal, fetch_k)
+                )
+
+        if len(shards) == 1:
+            results = [search(next(iter(shards.items())))]
+        else:
+            results = list(self._pool.map(search, shards.items()))
+        hits = [hit for shard_hits in results for hit in shard_hits]
+        return sorted(hits, key=lambda hit: hit[1])[:k]
+
+    def similarity_search_by_vector(self, embedding, k=4, collections=None, filter=None, fetch_k=20):
+        hits = self.similarity_search_with_score_by_vector(embedding, k=k, collections=collections, filter=filter, fetch_k=fetch_k)
+        return [doc for doc, _ in hits]
@@ -0,0 +1,176 @@
+import os
+import json
+import mmap
+import shutil
+import hashlib
+import tempfile
+import argparse
+from contextlib import contextmanager
+from collections.abc import Mapping
+import numpy as np
+import faiss
+from langchain_core.documents import Document
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+from utils.faiss_index import apply_search_params
+from config.config import SHARED_INDEX_DIR
+
+try:
+    import fcntl
+except ImportError: # Windows: no flock, so concurrent builders are not serialized.
+    fcntl = None
+
+CURRENT_FILE = "CURRENT"
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.jsonl"
+OFFSETS_FILE = "offsets.npy"
+SETTINGS_FILE = "settings.json"
+LOCK_FILE = ".build.lock"
+
+class PositionalIds(Mapping):
+    """Read-only index_to_docstore_id that maps FAISS position i to the id str(i) without storing a dict."""
+
+    def __init__(self, size):
+        self.size = size
+
+    def __getitem__(self, position):
+        if 0 <= position < self.size:
+            return str(int(position))
+        raise KeyError(position)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(range(self.size))
+
+class MmapDocstore(Docstore):
+    """
+    Read-only docstore over a memory-mapped file of JSON chunk records, addressed by an offsets array.
+    Pages are shared through the OS page cache, so extra worker processes add almost no resident memory.
+    """
+
+    def __init__(self, chunks_path, offsets_path):
+        self._file = open(chunks_path, "rb")
+        self._chunks = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = np.load(offsets_path, mmap_mode="r")
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def search(self, search):
+        position = int(search)
+        if not 0 <= position < len(self):
+            return f"ID {search} not found."
+        record = json.loads(self._chunks[int(self._offsets[position]):int(self._offsets[position + 1])])
+        return Document(page_content=record["page_content"], metadata=record["metadata"], id=record["id"])
+
+@contextmanager
+def build_lock(shared_dir=SHARED_INDEX_DIR):
+    """
+    Holds an exclusive flock on a lock file in shared_dir, so only one process (on any host sharing
+    the directory, where the filesystem supports flock) builds and publishes at a time.
+    """
+    os.makedirs(shared_dir, exist_ok=True)
+    with open(os.path.join(shared_dir, LOCK_FILE), "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def export_shared_index(vectorstore, shared_dir=SHARED_INDEX_DIR):
+    """
+    Publishes a vector store as a new read-only version under shared_dir: the FAISS index file,
+    the chunk records in index order, and their byte offsets. CURRENT is switched atomically,
+    so running workers keep their version and new workers attach to the latest one.
+    The store's index settings (chunking, embedding model and backend) are published with it.
+    Each version is written to a private temp directory and renamed into place, so concurrent
+    publishers never write the same files and a version directory is always complete.
+    """
+    ids = [vectorstore.index_to_docstore_id[i] for i in range(vectorstore.index.ntotal)]
+    settings = getattr(vectorstore, "index_settings", None)
+    fingerprint = "\n".join(ids) + "\n" + json.dumps(settings, sort_keys=True)
+    version = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
+    version_dir = os.path.join(shared_dir, version)
+
+    if not os.path.exists(os.path.join(version_dir, OFFSETS_FILE)):
+        os.makedirs(shared_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=f".{version}.", dir=shared_dir)
+        try:
+            os.chmod(tmp_dir, 0o755)
+            faiss.write_index(vectorstore.index, os.path.join(tmp_dir, INDEX_FILE))
+            with open(os.path.join(tmp_dir, SETTINGS_FILE), "w", encoding="utf-8") as f:
+                json.dump(settings, f, sort_keys=True)
+            offsets = [0]
+            with open(os.path.join(tmp_dir, CHUNKS_FILE), "wb") as f:
+                for doc_id in ids:
+                    doc = vectorstore.docstore.search(doc_id)
+                    record = {"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata}
+                    line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+                    f.write(line)
+                    offsets.append(offsets[-1] + len(line))
+            np.save(os.path.join(tmp_dir, OFFSETS_FILE), np.asarray(offsets, dtype=np.int64))
+            if os.path.isdir(version_dir) and not os.path.exists(os.path.join(version_dir, OFFSETS_FILE)):
+                # Left half-written by a publisher from before versions were renamed into place.
+                shutil.rmtree(version_dir, ignore_errors=True)
+            try:
+                os.rename(tmp_dir, version_dir)
+            except OSError:
+                # Another publisher renamed the same version into place first; its files are identical.
+                if not os.path.exists(os.path.join(version_dir, OFFSETS_FILE)):
+                    raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{CURRENT_FILE}.", dir=shared_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, os.path.join(shared_dir, CURRENT_FILE))
+    return version
+
+def load_shared_index(embedding_model, shared_dir=SHARED_INDEX_DIR, settings=None):
+    """
+    Attaches to the current published version as a read-only, memory-mapped FAISS store.
+    Returns None if nothing has been published yet, or if settings are given and the published
+    version was built with different ones (e.g. another embedding backend).
+    """
+    current_path = os.path.join(shared_dir, CURRENT_FILE)
+    if not os.path.exists(current_path):
+        return None
+    with open(current_path, "r", encoding="utf-8") as f:
+        version = f.read().strip()
+    version_dir = os.path.join(shared_dir, version)
+    settings_path = os.path.join(version_dir, SETTINGS_FILE)
+    published = None
+    if os.path.exists(settings_path):
+        with open(settings_path, "r", encoding="utf-8") as f:
+            published = json.load(f)
+    if settings is not None:
+        if published != json.loads(json.dumps(settings)):
+            print(f"Shared index version {version} was built with different settings; rebuilding.")
+            return None
+
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+    index = apply_search_params(faiss.read_index(os.path.join(version_dir, INDEX_FILE), flags))
+    docstore = MmapDocstore(os.path.join(version_dir, CHUNKS_FILE), os.path.join(version_dir, OFFSETS_FILE))
+    vectorstore = FAISS(embedding_model, index, docstore, PositionalIds(index.ntotal))
+    vectorstore.index_version = version
+    vectorstore.index_settings = published
+    return vectorstore
+
+if __name__ == "__main__":
+    from models.embeddings import get_embedding_model
+    from utils.rag_handler import setup_vector_store
+
+    parser = argparse.ArgumentParser(description="Build the knowledge base and publish it as a shared, memory-mapped index.")
+    parser.add_argument("--shared-dir", default=SHARED_INDEX_DIR)
+    args = parser.parse_args()
+    with build_lock(args.shared_dir):
+        built = setup_vector_store(get_embedding_model())
+        if built is None:
+            raise SystemExit("No documents found to build the knowledge base from.")
+        print(f"Published shared index version {export_shared_index(built, args.shared_dir)} to {args.shared_dir}")
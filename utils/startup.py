@@ -0,0 +1,59 @@
+import time
+import importlib
+import threading
+import traceback
+from utils.metrics import observe, timed
+
+_import_times = {}
+
+def timed_import(module_name):
+    """
+    Imports a module and records how long the first import took, both in the import
+    report and as an 'import.<module>' metrics stage. Later calls are free.
+    """
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    if module_name not in _import_times:
+        elapsed = time.perf_counter() - start
+        _import_times[module_name] = elapsed
+        observe(f"import.{module_name}", elapsed)
+    return module
+
+def import_report():
+    """Returns (module, seconds) pairs for every timed import, slowest first."""
+    return sorted(_import_times.items(), key=lambda item: item[1], reverse=True)
+
+class BackgroundTask:
+    """
+    Runs a function once on a daemon thread so the caller can keep serving the UI.
+    Use ready() to poll and result() to block until it has finished.
+    """
+
+    def __init__(self, name, fn, *args, **kwargs):
+        self.name = name
+        self.error = None
+        self._result = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(fn, args, kwargs), name=f"warmup-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, fn, args, kwargs):
+        try:
+            with timed(f"warmup.{self.name}"):
+                self._result = fn(*args, **kwargs)
+        except Exception as e:
+            self.error = e
+            print(f"--- ERROR while warming up {self.name} ---")
+            traceback.print_exc()
+        finally:
+            self._done.set()
+
+    def ready(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """Waits for the task and returns its result, or None if it failed or is still running after timeout."""
+        self._done.wait(timeout)
+        return self._result